@@ -1,7 +1,34 @@
+import argparse
+import multiprocessing
+import os
 import sys
-import re
+from collections import OrderedDict
+from collections.abc import Iterable
+from functools import partial, reduce
+from itertools import compress
+from operator import methodcaller, or_
+from typing import TextIO
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.loader import (
+    DEFAULT_SERVED_AUTOMATA,
+    NFA_TRANSITION,
+    TransitionTable,
+    drop_empty_nfa_transitions,
+    load_nfa_transitions,
+    paused_garbage_collection,
+    read_lines,
+    split_transition_lines,
+)
+from common.stats import Stats, timed_phase
+from common.streaming import detach_first_line, iter_input_sequences, open_output
 
 TRANSITIONS = {}
+DEFAULT_CACHE_SIZE = 4096
+# Instrumentation of the run, set only with `--stats`
+STATS = None
+# Compiled automaton of a `--jobs` worker process, set by `init_worker`
+WORKER_NFA = None
 
 
 def parse_input_data(input_line: str) -> list[list[str]]:
@@ -9,25 +36,14 @@ def parse_input_data(input_line: str) -> list[list[str]]:
 
 
 def parse_transitions(transition_lines: list[str]) -> None:
-    for line in transition_lines:
-        # Using a more descriptive regex variable name
-        match_result = re.match(r"(.*),(.*)->(.*)", line.strip())
-        if not match_result:
-            print(
-                f"Warning: Malformed transition line skipped: {line.strip()}",
-                file=sys.stderr,
-            )
-            continue
-
-        current_state, input_symbol, next_states_str = match_result.groups()
-
-        # If the destination is '#', it means no transition, so we skip it.
-        if next_states_str == "#":
-            continue
-
-        # Split next states and store them
-        next_states = next_states_str.split(",")
-        TRANSITIONS[(current_state, input_symbol)] = next_states
+    states, symbols, next_states = drop_empty_nfa_transitions(
+        split_transition_lines(list(map(str.strip, transition_lines)), NFA_TRANSITION)
+    )
+    # A repeated (state, symbol) pair keeps the next states of its last line
+    with paused_garbage_collection():
+        TRANSITIONS.update(
+            zip(zip(states, symbols), map(methodcaller("split", ","), next_states))
+        )
 
 
 def format_output(states_list: list[list[str]]) -> str:
@@ -54,6 +70,10 @@ def get_epsilon_closure(states: set[str]) -> set[str]:
             if next_state not in closure:
                 closure.add(next_state)
                 stack.append(next_state)
+
+    if STATS is not None:
+        STATS.count("epsilon_closure_expansions")
+        STATS.count("epsilon_closure_visited_states", len(closure))
     return closure
 
 
@@ -76,29 +96,538 @@ def simulate_nfa(input_symbols: list[str], start_state: str) -> list[list[str]]:
     return all_step_results
 
 
-if __name__ == "__main__":
-    # Read all lines from stdin
-    file_content = [line.strip() for line in sys.stdin.readlines()]
-
-    # Destructure the input lines for better readability
-    # This assumes exactly 6 parts to the input based on your original code.
-    try:
-        input_strings_raw = file_content[0]
-        all_states_raw = file_content[1]
-        symbols_raw = file_content[2]
-        acceptable_states_raw = file_content[3]
-        starting_state = file_content[4]
-        transition_lines = file_content[5:]
-    except IndexError:
-        print(
-            "Error: Incomplete input provided. Please check the input format.",
-            file=sys.stderr,
+class CompiledNFA:
+    """Integer form of a loaded `TransitionTable` with state sets stored as int
+    bitmasks.
+    """
+
+    def __init__(self, transition_table: TransitionTable, start_state: str) -> None:
+        # Like in `TRANSITIONS`, the last line of a (state, symbol) pair wins
+        last_lines = dict(
+            zip(
+                zip(transition_table.sources, transition_table.inputs),
+                range(len(transition_table)),
+            )
         )
-        sys.exit(1)  # Exit with an error code
+        table_states = transition_table.states
+        states = {start_state}
+        symbols = set()
+        for (state, symbol), index in last_lines.items():
+            states.add(table_states[state])
+            states.update(
+                map(table_states.__getitem__, transition_table.target_ids(index))
+            )
+            symbols.add(transition_table.symbols[symbol])
+
+        # States are numbered in sorted order, so walking a mask from the lowest
+        # bit upwards yields the same ordering as `sorted()` on the names.
+        self.state_names = sorted(states)
+        self.state_ids = {state: index for index, state in enumerate(self.state_names)}
+        # Compiled id of every state of the table
+        compiled_ids = [self.state_ids.get(state, -1) for state in table_states]
+
+        epsilon = transition_table.symbol_ids.get("$")
+        epsilon_edges = [[] for _ in self.state_names]
+        for (state, symbol), index in last_lines.items():
+            if symbol == epsilon:
+                epsilon_edges[compiled_ids[state]] = list(
+                    map(compiled_ids.__getitem__, transition_table.target_ids(index))
+                )
+        self.closures = self.compute_epsilon_closures(epsilon_edges)
+        self.start_mask = self.closures[self.state_ids[start_state]]
+
+        symbol_rows = {symbol: [0] * len(self.state_names) for symbol in symbols}
+        for (state, symbol), index in last_lines.items():
+            mask = 0
+            for next_state in transition_table.target_ids(index):
+                mask |= self.closures[compiled_ids[next_state]]
+            symbol_rows[transition_table.symbols[symbol]][compiled_ids[state]] = mask
+
+        # Symbols with identical rows behave the same from every state, so they
+        # share one alphabet class. successors[class][state] is the
+        # epsilon-closed set of states reached from `state` on any symbol of
+        # that class, and symbol_ids maps each symbol to its class.
+        self.successors = []
+        self.symbol_ids = {}
+        row_classes = {}
+        for symbol in sorted(symbols):
+            row = symbol_rows[symbol]
+            symbol_class = row_classes.setdefault(tuple(row), len(self.successors))
+            if symbol_class == len(self.successors):
+                self.successors.append(row)
+            self.symbol_ids[symbol] = symbol_class
+
+        if STATS is not None:
+            STATS.count("compiled_states", len(self.state_names))
+            STATS.count("symbol_classes", len(self.successors))
+            # Closures are computed once per state here rather than once per
+            # step as in get_epsilon_closure, so they get their own counters.
+            STATS.count("precomputed_epsilon_closures", len(self.closures))
+            STATS.count(
+                "precomputed_epsilon_closure_states",
+                sum(bin(closure).count("1") for closure in self.closures),
+            )
+
+    def compute_epsilon_closures(self, epsilon_edges: list[list[int]]) -> list[int]:
+        # Tarjan's algorithm emits strongly connected components of the epsilon
+        # graph in reverse topological order, so every component can take the
+        # union of the (already final) closures of the components it reaches.
+        closures = [0] * len(self.state_names)
+        index_of = [-1] * len(self.state_names)
+        lowlink = [0] * len(self.state_names)
+        on_stack = [False] * len(self.state_names)
+        component_stack = []
+        counter = 0
+
+        for root in range(len(self.state_names)):
+            if index_of[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                state, edge_index = work.pop()
+                if edge_index == 0:
+                    index_of[state] = lowlink[state] = counter
+                    counter += 1
+                    component_stack.append(state)
+                    on_stack[state] = True
+                edges = epsilon_edges[state]
+                while edge_index < len(edges):
+                    next_state = edges[edge_index]
+                    edge_index += 1
+                    if index_of[next_state] == -1:
+                        work.append((state, edge_index))
+                        work.append((next_state, 0))
+                        break
+                    if on_stack[next_state]:
+                        lowlink[state] = min(lowlink[state], index_of[next_state])
+                else:
+                    if lowlink[state] == index_of[state]:
+                        component = []
+                        while True:
+                            member = component_stack.pop()
+                            on_stack[member] = False
+                            component.append(member)
+                            if member == state:
+                                break
+                        mask = 0
+                        for member in component:
+                            mask |= 1 << member
+                        for member in component:
+                            for next_state in epsilon_edges[member]:
+                                mask |= closures[next_state]
+                        for member in component:
+                            closures[member] = mask
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[state])
+        return closures
+
+    def symbol_class(self, symbol: str) -> int:
+        # -1 stands for symbols without any transition
+        return self.symbol_ids.get(symbol, -1)
+
+    def step_class(self, states_mask: int, symbol_class: int) -> int:
+        if symbol_class < 0:
+            return 0
+        row = self.successors[symbol_class]
+        return reduce(or_, compress(row, mask_selectors(states_mask)), 0)
+
+    def step(self, states_mask: int, symbol: str) -> int:
+        return self.step_class(states_mask, self.symbol_class(symbol))
+
+    def mask_to_states(self, states_mask: int) -> list[str]:
+        return list(compress(self.state_names, mask_selectors(states_mask)))
+
+
+def mask_selectors(states_mask: int):
+    # bin() renders the mask most significant bit first; reversing it gives one
+    # selector per state id, which lets `compress` do the bit walk in C.
+    return map("1".__eq__, bin(states_mask)[:1:-1])
+
+
+class LazyDeterminizer:
+    """Lazily built subset construction over a `CompiledNFA`.
+
+    Transitions (state set, symbol class) -> epsilon-closed state set are
+    memoized in an LRU cache holding at most `max_entries` transitions; rendered
+    state lists are cached the same way. `hits` and `misses` count transition
+    lookups.
+    """
+
+    def __init__(
+        self, compiled_nfa: CompiledNFA, max_entries: int = DEFAULT_CACHE_SIZE
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.compiled_nfa = compiled_nfa
+        self.start_mask = compiled_nfa.start_mask
+        self.max_entries = max_entries
+        self.transitions = OrderedDict()
+        self.state_lists = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def symbol_class(self, symbol: str) -> int:
+        return self.compiled_nfa.symbol_class(symbol)
+
+    def step_class(self, states_mask: int, symbol_class: int) -> int:
+        key = (states_mask, symbol_class)
+        next_mask = self.transitions.get(key)
+        if next_mask is not None:
+            self.hits += 1
+            self.transitions.move_to_end(key)
+            return next_mask
+
+        self.misses += 1
+        next_mask = self.compiled_nfa.step_class(states_mask, symbol_class)
+        self.transitions[key] = next_mask
+        if len(self.transitions) > self.max_entries:
+            self.transitions.popitem(last=False)
+        return next_mask
+
+    def step(self, states_mask: int, symbol: str) -> int:
+        return self.step_class(states_mask, self.symbol_class(symbol))
+
+    def mask_to_states(self, states_mask: int) -> list[str]:
+        states = self.state_lists.get(states_mask)
+        if states is not None:
+            self.state_lists.move_to_end(states_mask)
+            return states
+
+        states = self.compiled_nfa.mask_to_states(states_mask)
+        self.state_lists[states_mask] = states
+        if len(self.state_lists) > self.max_entries:
+            self.state_lists.popitem(last=False)
+        return states
+
+
+def simulate_compiled_nfa(
+    compiled_nfa: CompiledNFA | LazyDeterminizer, input_symbols: list[str]
+) -> list[list[str]]:
+    current_mask = compiled_nfa.start_mask
+    all_step_results = [compiled_nfa.mask_to_states(current_mask)]
+
+    for symbol in input_symbols:
+        current_mask = compiled_nfa.step(current_mask, symbol)
+        all_step_results.append(compiled_nfa.mask_to_states(current_mask))
 
-    input_sequences = parse_input_data(input_strings_raw)
-    parse_transitions(transition_lines)
+    return all_step_results
+
+
+def simulate_prefix_trie(
+    compiled_nfa: CompiledNFA | LazyDeterminizer, input_sequences: list[list[str]]
+) -> list[str]:
+    # Every trie node stands for a distinct input prefix; the state set after
+    # that prefix is computed once, when the edge leading to the node is added.
+    children = [{}]
+    parents = [-1]
+    node_outputs = [
+        format_output([compiled_nfa.mask_to_states(compiled_nfa.start_mask)])
+    ]
+    node_masks = [compiled_nfa.start_mask]
+    sequence_ends = []
 
     for input_sequence in input_sequences:
-        simulation_result = simulate_nfa(input_sequence, starting_state)
-        print(format_output(simulation_result))
+        node = 0
+        for symbol in input_sequence:
+            # Symbols of one alphabet class lead to the same node
+            symbol_class = compiled_nfa.symbol_class(symbol)
+            child = children[node].get(symbol_class)
+            if child is None:
+                child = len(children)
+                children[node][symbol_class] = child
+                children.append({})
+                parents.append(node)
+                next_mask = compiled_nfa.step_class(node_masks[node], symbol_class)
+                node_masks.append(next_mask)
+                node_outputs.append(
+                    format_output([compiled_nfa.mask_to_states(next_mask)])
+                )
+            node = child
+        sequence_ends.append(node)
+
+    output_lines = []
+    for node in sequence_ends:
+        path_outputs = []
+        while node != -1:
+            path_outputs.append(node_outputs[node])
+            node = parents[node]
+        output_lines.append("|".join(reversed(path_outputs)))
+    return output_lines
+
+
+def stream_compiled_nfa(
+    compiled_nfa: CompiledNFA | LazyDeterminizer,
+    input_sequences: Iterable[Iterable[str]],
+    output: TextIO,
+) -> None:
+    # Same text as `format_output(simulate_compiled_nfa(...))`, written step by
+    # step so that no sequence is ever held in memory as a whole.
+    start_output = format_output([compiled_nfa.mask_to_states(compiled_nfa.start_mask)])
+    for input_sequence in input_sequences:
+        current_mask = compiled_nfa.start_mask
+        output.write(start_output)
+        for symbol in input_sequence:
+            current_mask = compiled_nfa.step(current_mask, symbol)
+            output.write("|")
+            output.write(format_output([compiled_nfa.mask_to_states(current_mask)]))
+        output.write("\n")
+
+
+def init_worker(compiled_nfa: CompiledNFA | LazyDeterminizer) -> None:
+    global WORKER_NFA
+    WORKER_NFA = compiled_nfa
+
+
+def simulate_chunk(input_sequences: list[list[str]], use_trie: bool) -> list[str]:
+    if use_trie:
+        return simulate_prefix_trie(WORKER_NFA, input_sequences)
+    return [
+        format_output(simulate_compiled_nfa(WORKER_NFA, input_sequence))
+        for input_sequence in input_sequences
+    ]
+
+
+def simulate_in_parallel(
+    compiled_nfa: CompiledNFA | LazyDeterminizer,
+    input_sequences: list[list[str]],
+    jobs: int,
+    use_trie: bool = False,
+) -> Iterable[str]:
+    # The automaton is compiled once and handed to every worker on start-up
+    # (inherited on fork, pickled otherwise); only sequences travel per task.
+    chunk_size = max(1, len(input_sequences) // (jobs * 4))
+    chunks = [
+        input_sequences[start : start + chunk_size]
+        for start in range(0, len(input_sequences), chunk_size)
+    ]
+    with multiprocessing.Pool(
+        jobs, initializer=init_worker, initargs=(compiled_nfa,)
+    ) as pool:
+        for output_lines in pool.imap(
+            partial(simulate_chunk, use_trie=use_trie), chunks
+        ):
+            yield from output_lines
+
+
+def compile_served_nfa(
+    definition_lines: list[str], engine: str, cache_size: int
+) -> CompiledNFA | LazyDeterminizer:
+    # `definition_lines` are the input lines after the input sequences
+    transition_table = load_nfa_transitions(definition_lines[4:])
+    compiled_nfa = CompiledNFA(transition_table, definition_lines[3])
+    if engine == "lazy":
+        return LazyDeterminizer(compiled_nfa, cache_size)
+    return compiled_nfa
+
+
+def answer_served_nfa(
+    compiled_nfa: CompiledNFA | LazyDeterminizer, query_lines: list[str], use_trie: bool
+) -> bytes:
+    input_sequences = parse_input_data(query_lines[0])
+    if use_trie:
+        output_lines = simulate_prefix_trie(compiled_nfa, input_sequences)
+    else:
+        output_lines = [
+            format_output(simulate_compiled_nfa(compiled_nfa, input_sequence))
+            for input_sequence in input_sequences
+        ]
+    return "".join(f"{output_line}\n" for output_line in output_lines).encode()
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Simulate an epsilon-NFA read from standard input."
+    )
+    argument_parser.add_argument(
+        "--engine",
+        choices=("bitset", "lazy", "set"),
+        default="bitset",
+        help="simulation engine: compiled bitmasks (default), bitmasks with a "
+        "lazily built subset-construction cache, or plain Python sets",
+    )
+    argument_parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help="maximum number of cached transitions for the lazy engine",
+    )
+    argument_parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="report lazy engine cache hits and misses on standard error",
+    )
+    argument_parser.add_argument(
+        "--trie",
+        action="store_true",
+        help="share work between input sequences with common prefixes",
+    )
+    argument_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="read the input sequences incrementally and write results as they "
+        "are produced, keeping memory flat for very long input lines",
+    )
+    argument_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes that simulate input sequences",
+    )
+    argument_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="report counters and per-phase wall times as JSON on standard error",
+    )
+    argument_parser.add_argument(
+        "--serve",
+        metavar="SOCKET",
+        help="instead of reading standard input, answer requests sent to the Unix "
+        "socket SOCKET, keeping compiled automata in memory between requests",
+    )
+    argument_parser.add_argument(
+        "--served-automata",
+        type=int,
+        default=DEFAULT_SERVED_AUTOMATA,
+        help="maximum number of compiled automata kept by --serve",
+    )
+    arguments = argument_parser.parse_args()
+    if arguments.jobs < 1:
+        argument_parser.error("--jobs must be at least 1")
+    if arguments.cache_size < 1:
+        argument_parser.error("--cache-size must be at least 1")
+    if arguments.stats and arguments.jobs > 1:
+        argument_parser.error("--stats cannot be combined with --jobs")
+    if arguments.cache_stats and arguments.jobs > 1:
+        argument_parser.error("--cache-stats cannot be combined with --jobs")
+    if arguments.stats:
+        STATS = Stats("SimEnka")
+    if arguments.jobs > 1 and (arguments.stream or arguments.engine == "set"):
+        argument_parser.error(
+            "--jobs requires the bitset or lazy engine without --stream"
+        )
+    if arguments.trie and arguments.engine == "set":
+        argument_parser.error("--trie requires the bitset or lazy engine")
+    if arguments.stream and (arguments.trie or arguments.engine == "set"):
+        argument_parser.error(
+            "--stream requires the bitset or lazy engine without --trie"
+        )
+    if arguments.serve and arguments.engine == "set":
+        argument_parser.error("--serve requires the bitset or lazy engine")
+    if arguments.serve and (
+        arguments.stream
+        or arguments.jobs > 1
+        or arguments.stats
+        or arguments.cache_stats
+    ):
+        argument_parser.error(
+            "--serve cannot be combined with --stream, --jobs, --stats or --cache-stats"
+        )
+    if arguments.served_automata < 1:
+        argument_parser.error("--served-automata must be at least 1")
+
+    if arguments.serve:
+        # asyncio costs about 10 MiB and 20 ms at startup, so only --serve
+        # imports the server
+        from common.server import serve
+
+        # Every request holds one input line followed by the automaton
+        serve(
+            arguments.serve,
+            1,
+            partial(
+                compile_served_nfa,
+                engine=arguments.engine,
+                cache_size=arguments.cache_size,
+            ),
+            partial(answer_served_nfa, use_trie=arguments.trie),
+            arguments.served_automata,
+        )
+        sys.exit()
+
+    with timed_phase(STATS, "parse"):
+        if arguments.stream:
+            # The first line is left on disk and tokenized once the automaton is known
+            read_input_line = detach_first_line(sys.stdin)
+            file_content = [""] + read_lines(sys.stdin)
+        else:
+            # Read all lines from stdin
+            file_content = read_lines(sys.stdin)
+
+        # Destructure the input lines for better readability
+        # This assumes exactly 6 parts to the input based on your original code.
+        try:
+            input_strings_raw = file_content[0]
+            all_states_raw = file_content[1]
+            symbols_raw = file_content[2]
+            acceptable_states_raw = file_content[3]
+            starting_state = file_content[4]
+            transition_lines = file_content[5:]
+        except IndexError:
+            print(
+                "Error: Incomplete input provided. Please check the input format.",
+                file=sys.stderr,
+            )
+            sys.exit(1)  # Exit with an error code
+
+        if arguments.engine == "set":
+            parse_transitions(transition_lines)
+        else:
+            # The compiled engines only need the interned transitions
+            transition_table = load_nfa_transitions(transition_lines)
+        if arguments.stream:
+            input_sequences = iter_input_sequences(read_input_line())
+        else:
+            input_sequences = parse_input_data(input_strings_raw)
+
+    if arguments.engine == "set":
+        with timed_phase(STATS, "simulate"):
+            for input_sequence in input_sequences:
+                simulation_result = simulate_nfa(input_sequence, starting_state)
+                print(format_output(simulation_result))
+    else:
+        with timed_phase(STATS, "compile"):
+            compiled_nfa = CompiledNFA(transition_table, starting_state)
+            if arguments.engine == "lazy":
+                compiled_nfa = LazyDeterminizer(compiled_nfa, arguments.cache_size)
+        # Results are written as they are produced, so "simulate" includes
+        # formatting them and "output" is only the final flush
+        if arguments.jobs > 1:
+            output = open_output()
+            for output_line in simulate_in_parallel(
+                compiled_nfa, input_sequences, arguments.jobs, arguments.trie
+            ):
+                output.write(output_line)
+                output.write("\n")
+            output.flush()
+        elif arguments.trie:
+            with timed_phase(STATS, "simulate"):
+                for output_line in simulate_prefix_trie(compiled_nfa, input_sequences):
+                    print(output_line)
+        elif arguments.stream:
+            output = open_output()
+            with timed_phase(STATS, "simulate"):
+                stream_compiled_nfa(compiled_nfa, input_sequences, output)
+            with timed_phase(STATS, "output"):
+                output.flush()
+        else:
+            with timed_phase(STATS, "simulate"):
+                for input_sequence in input_sequences:
+                    simulation_result = simulate_compiled_nfa(
+                        compiled_nfa, input_sequence
+                    )
+                    print(format_output(simulation_result))
+        if arguments.engine == "lazy" and arguments.cache_stats:
+            print(
+                f"lazy cache: {compiled_nfa.hits} hits, {compiled_nfa.misses} misses, "
+                f"{len(compiled_nfa.transitions)} cached transitions",
+                file=sys.stderr,
+            )
+        if arguments.engine == "lazy" and STATS is not None:
+            STATS.count("lazy_cache_hits", compiled_nfa.hits)
+            STATS.count("lazy_cache_misses", compiled_nfa.misses)
+
+    if STATS is not None:
+        with timed_phase(STATS, "output"):
+            sys.stdout.flush()
+        STATS.report()
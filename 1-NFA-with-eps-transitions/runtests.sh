@@ -7,7 +7,7 @@ do
     dir=$(printf "%02d\n" $i)
     echo "Test $dir"
 
-    res=$(python SimEnka.py < "testovi/test$dir/test.a" | diff "testovi/test$dir/test.b" -)
+    res=$(python SimEnka.py "$@" < "testovi/test$dir/test.a" | diff "testovi/test$dir/test.b" -)
     if [ "$res" != "" ]
     then
         echo "FAIL $res"
@@ -0,0 +1,140 @@
+import argparse
+import os
+import sys
+from collections import deque
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        "1-NFA-with-eps-transitions",
+    )
+)
+import MinDKA
+import SimEnka
+
+
+def determinize(
+    symbols: list[str], acceptable_states: set[str], start_state: str
+) -> tuple[list[str], list[str], list[str], str, dict[tuple[str, str], str]]:
+    # Subset construction over `SimEnka.TRANSITIONS`. Every reachable non-empty
+    # set of NFA states becomes one DFA state named p0, p1, ... in discovery
+    # order; the empty set is left out, so the DFA has no transition there.
+    start_subset = frozenset(SimEnka.get_epsilon_closure({start_state}))
+    subset_names = {start_subset: "p0"}
+    queue = deque([start_subset])
+    dfa_acceptable_states = []
+    dfa_transitions = {}
+
+    while queue:
+        subset = queue.popleft()
+        subset_name = subset_names[subset]
+        if not subset.isdisjoint(acceptable_states):
+            dfa_acceptable_states.append(subset_name)
+
+        for symbol in symbols:
+            next_states = set()
+            for state in subset:
+                next_states.update(SimEnka.TRANSITIONS.get((state, symbol), []))
+            if not next_states:
+                continue
+
+            next_subset = frozenset(SimEnka.get_epsilon_closure(next_states))
+            if next_subset not in subset_names:
+                subset_names[next_subset] = f"p{len(subset_names)}"
+                queue.append(next_subset)
+            dfa_transitions[(subset_name, symbol)] = subset_names[next_subset]
+
+    return (
+        list(subset_names.values()),
+        symbols,
+        dfa_acceptable_states,
+        subset_names[start_subset],
+        dfa_transitions,
+    )
+
+
+def run_dfa(
+    final_acceptable_states: set[str],
+    final_start_state: str,
+    final_transition_table: dict[tuple[str, str], str],
+    input_symbols: list[str],
+) -> bool:
+    current_state = final_start_state
+    for symbol in input_symbols:
+        current_state = final_transition_table.get((current_state, symbol))
+        if current_state is None:
+            return False
+    return current_state in final_acceptable_states
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Compile an epsilon-NFA in the SimEnka input format into a "
+        "minimal DFA in the MinDKA output format."
+    )
+    argument_parser.add_argument(
+        "--algorithm",
+        choices=MinDKA.MINIMIZATION_ALGORITHMS,
+        default="hopcroft",
+        help="minimization algorithm used by MinDKA",
+    )
+    argument_parser.add_argument(
+        "--run",
+        action="store_true",
+        help="instead of printing the DFA, run the input sequences on it and "
+        "print 1 (accepted) or 0 (rejected) for each of them",
+    )
+    arguments = argument_parser.parse_args()
+
+    file_content = [line.strip() for line in sys.stdin.readlines()]
+    try:
+        input_strings_raw = file_content[0]
+        symbols_raw = file_content[2]
+        acceptable_states_raw = file_content[3]
+        starting_state = file_content[4]
+        transition_lines = file_content[5:]
+    except IndexError:
+        print(
+            "Error: Incomplete input provided. Please check the input format.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    SimEnka.parse_transitions(transition_lines)
+    # Symbols used only in transitions still have to survive determinization
+    dfa_symbols = set(symbols_raw.split(","))
+    dfa_symbols.update(symbol for _, symbol in SimEnka.TRANSITIONS)
+    dfa_symbols.discard("$")
+    MinDKA.load_dfa(
+        *determinize(
+            sorted(dfa_symbols), set(acceptable_states_raw.split(",")), starting_state
+        )
+    )
+
+    (
+        new_states,
+        final_symbols,
+        final_acceptable_states,
+        final_start_state,
+        final_transition_table,
+    ) = MinDKA.minimize_dfa(arguments.algorithm)
+
+    if arguments.run:
+        final_acceptable_set = set(final_acceptable_states)
+        for input_sequence in SimEnka.parse_input_data(input_strings_raw):
+            accepted = run_dfa(
+                final_acceptable_set,
+                final_start_state,
+                final_transition_table,
+                input_sequence,
+            )
+            print(1 if accepted else 0)
+    else:
+        MinDKA.print_minimized_dfa(
+            new_states,
+            final_symbols,
+            final_acceptable_states,
+            final_start_state,
+            final_transition_table,
+        )
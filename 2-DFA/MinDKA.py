@@ -1,6 +1,28 @@
+import argparse
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
 import sys
-import re
-from collections import defaultdict
+from array import array
+from collections import defaultdict, deque
+from contextlib import suppress
+from functools import partial
+from itertools import chain, count
+from operator import add
+from typing import TextIO
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.loader import (
+    DEFAULT_SERVED_AUTOMATA,
+    DFA_TRANSITION,
+    paused_garbage_collection,
+    read_lines,
+    split_transition_lines,
+)
+from common.stats import Stats, timed_phase
 
 # Module-level constants
 TRANSITIONS = {}
@@ -8,6 +30,23 @@ ALL_STATES = []
 SYMBOLS = []
 ACCEPTABLE_STATES = []
 START_STATE = ""
+# Instrumentation of the run, set only with `--stats`
+STATS = None
+
+MINIMIZATION_ALGORITHMS = ("hopcroft", "moore", "table")
+
+# On-disk partition cache: a header (magic, version, byte order, state count)
+# followed by one native int32 class label per state in canonical order.
+CACHE_HEADER = struct.Struct("<4sBcxxI")
+CACHE_MAGIC = b"MDKA"
+CACHE_VERSION = 1
+CACHE_BYTE_ORDER = b"<" if sys.byteorder == "little" else b">"
+CACHE_SUFFIX = ".mdka"
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+RUN_OUTPUT_BATCH = 1 << 16
+# Class id that IncrementalDFA signatures use for a missing transition
+MISSING_CLASS = -1
 
 
 def parse_dfa_input(input_lines: list[str]) -> None:
@@ -21,17 +60,12 @@ def parse_dfa_input(input_lines: list[str]) -> None:
         ACCEPTABLE_STATES = input_lines[2].strip().split(",")
         START_STATE = input_lines[3].strip()
 
-        # Parse transitions
-        for line in input_lines[4:]:
-            match_result = re.match(r"^(.+?),(.+?)->(.+)$", line.strip())
-            if not match_result:
-                print(
-                    f"Warning: Malformed transition line skipped: {line.strip()}",
-                    file=sys.stderr,
-                )
-                continue
-            current_state, symbol, next_state = match_result.groups()
-            TRANSITIONS[(current_state, symbol)] = next_state
+        # Parse transitions; a repeated (state, symbol) pair keeps its last line
+        states, symbols, next_states = split_transition_lines(
+            list(map(str.strip, input_lines[4:])), DFA_TRANSITION
+        )
+        with paused_garbage_collection():
+            TRANSITIONS = dict(zip(zip(states, symbols), next_states))
     except IndexError as e:
         print(
             f"Error: Incomplete or malformed input. Missing lines: {e}", file=sys.stderr
@@ -39,12 +73,29 @@ def parse_dfa_input(input_lines: list[str]) -> None:
         sys.exit(1)
 
 
+def load_dfa(
+    all_states: list[str],
+    symbols: list[str],
+    acceptable_states: list[str],
+    start_state: str,
+    transitions: dict[tuple[str, str], str],
+) -> None:
+    # Same module state as `parse_dfa_input`, for DFAs built in memory
+    global ALL_STATES, SYMBOLS, ACCEPTABLE_STATES, START_STATE, TRANSITIONS
+
+    ALL_STATES = list(all_states)
+    SYMBOLS = sorted(symbols)
+    ACCEPTABLE_STATES = list(acceptable_states)
+    START_STATE = start_state
+    TRANSITIONS = dict(transitions)
+
+
 def find_reachable_states() -> set[str]:
     reachable = set()
-    queue = [START_STATE]  # Use a list as a queue for BFS
+    queue = deque([START_STATE])
 
     while queue:
-        current_state = queue.pop(0)  # Pop from the beginning for BFS
+        current_state = queue.popleft()
         if current_state not in reachable:
             reachable.add(current_state)
             for symbol in SYMBOLS:
@@ -57,13 +108,14 @@ def find_reachable_states() -> set[str]:
 
 
 def find_distinguishable_pairs(
-    reachable_states: set[str],
+    reachable_states: set[str], symbols: list[str] | None = None
 ) -> dict[tuple[str, str], bool]:
+    if symbols is None:
+        symbols = SYMBOLS
     # Initialize the distinguishability table (M in common algorithms)
     # Using a dictionary for sparse storage, False means not distinguishable yet.
     distinguishable_table = defaultdict(bool)
-    # Store relations for marking later
-    relations_to_mark = defaultdict(list)  # { (q_i, q_j): [ (q_k, q_l), ... ] }
+    acceptable_states = set(ACCEPTABLE_STATES)
     sorted_reachable_states = sorted(list(reachable_states))
 
     # Phase 1: Mark (p, q) if p is accepting and q is non-accepting
@@ -77,8 +129,8 @@ def find_distinguishable_pairs(
             if state1 > state2:  # Ensure consistent ordering for the key
                 pair = (state2, state1)
 
-            is_state1_accepting = state1 in ACCEPTABLE_STATES
-            is_state2_accepting = state2 in ACCEPTABLE_STATES
+            is_state1_accepting = state1 in acceptable_states
+            is_state2_accepting = state2 in acceptable_states
 
             if is_state1_accepting != is_state2_accepting:
                 distinguishable_table[pair] = True
@@ -88,6 +140,14 @@ def find_distinguishable_pairs(
     something_marked_in_this_pass = True
     while something_marked_in_this_pass:
         something_marked_in_this_pass = False
+        if STATS is not None:
+            # Every pair not marked yet gets checked in this pass
+            state_count = len(sorted_reachable_states)
+            pair_count = state_count * (state_count - 1) // 2
+            STATS.count("table_refinement_passes")
+            STATS.count(
+                "table_pair_checks", pair_count - sum(distinguishable_table.values())
+            )
         for i, state1 in enumerate(sorted_reachable_states):
             for j in range(i + 1, len(sorted_reachable_states)):
                 state2 = sorted_reachable_states[j]
@@ -99,7 +159,7 @@ def find_distinguishable_pairs(
                 if distinguishable_table[pair]:  # Already marked, skip
                     continue
 
-                for symbol in SYMBOLS:
+                for symbol in symbols:
                     next_state1 = TRANSITIONS.get((state1, symbol))
                     next_state2 = TRANSITIONS.get((state2, symbol))
 
@@ -124,10 +184,6 @@ def find_distinguishable_pairs(
                             distinguishable_table[pair] = True
                             something_marked_in_this_pass = True
                             break  # Marked, move to next (state1, state2) pair
-                    else:
-                        # If (next_state1, next_state2) is not yet marked,
-                        # then (state1, state2) is indistinguishable FOR NOW.
-                        relations_to_mark[next_pair].append(pair)
 
     return distinguishable_table
 
@@ -176,6 +232,255 @@ def find_representative(state: str, representative_map: dict[str, str]) -> str:
     return representative_map[state]
 
 
+def hopcroft_partition(successors: list[list[int]], labels: list[int]) -> list[int]:
+    # Hopcroft's partition refinement. `successors[state][symbol]` must be a
+    # total transition function; states with equal labels start in the same
+    # block. Returns the final block index of every state.
+    num_symbols = len(successors[0]) if successors else 0
+    predecessors = [[[] for _ in successors] for _ in range(num_symbols)]
+    for state, row in enumerate(successors):
+        for symbol, next_state in enumerate(row):
+            predecessors[symbol][next_state].append(state)
+
+    blocks_by_label = {}
+    for state, label in enumerate(labels):
+        blocks_by_label.setdefault(label, set()).add(state)
+    blocks = list(blocks_by_label.values())
+    block_of = [0] * len(successors)
+    for block_index, block in enumerate(blocks):
+        for state in block:
+            block_of[state] = block_index
+
+    # Every initial block but the largest one has to be used as a splitter
+    largest_block = max(
+        range(len(blocks)), key=lambda index: len(blocks[index]), default=0
+    )
+    worklist = [
+        (block_index, symbol)
+        for block_index in range(len(blocks))
+        if block_index != largest_block
+        for symbol in range(num_symbols)
+    ]
+    waiting = set(worklist)
+    splitter_count = 0
+
+    while worklist:
+        splitter = worklist.pop()
+        splitter_count += 1
+        waiting.discard(splitter)
+        splitter_block, splitter_symbol = splitter
+        symbol_predecessors = predecessors[splitter_symbol]
+
+        # Group the predecessors of the splitter by the block they live in
+        touched_blocks = defaultdict(list)
+        for state in blocks[splitter_block]:
+            for predecessor in symbol_predecessors[state]:
+                touched_blocks[block_of[predecessor]].append(predecessor)
+
+        for block_index, moved_states in touched_blocks.items():
+            block = blocks[block_index]
+            if len(moved_states) == len(block):
+                continue
+            new_block_index = len(blocks)
+            block.difference_update(moved_states)
+            blocks.append(set(moved_states))
+            for state in moved_states:
+                block_of[state] = new_block_index
+
+            smaller_block = (
+                new_block_index if len(moved_states) <= len(block) else block_index
+            )
+            for symbol in range(num_symbols):
+                if (block_index, symbol) in waiting:
+                    new_splitter = (new_block_index, symbol)
+                else:
+                    new_splitter = (smaller_block, symbol)
+                waiting.add(new_splitter)
+                worklist.append(new_splitter)
+
+    if STATS is not None:
+        STATS.count("hopcroft_splitters", splitter_count)
+        STATS.count("hopcroft_blocks", len(blocks))
+    return block_of
+
+
+def find_equivalent_states_hopcroft(
+    reachable_states: set[str], symbols: list[str] | None = None
+) -> dict[str, str]:
+    # Missing transitions lead to an extra sink state with a label of its own:
+    # like the pair table, a defined and an undefined transition always
+    # distinguish two states, while two undefined ones never do.
+    if symbols is None:
+        symbols = SYMBOLS
+    sorted_reachable_states = sorted(reachable_states)
+    state_ids = {state: index for index, state in enumerate(sorted_reachable_states)}
+    sink = len(sorted_reachable_states)
+    acceptable_states = set(ACCEPTABLE_STATES)
+
+    successors = []
+    labels = []
+    for state in sorted_reachable_states:
+        row = []
+        for symbol in symbols:
+            next_state = TRANSITIONS.get((state, symbol))
+            row.append(state_ids[next_state] if next_state else sink)
+        successors.append(row)
+        labels.append(1 if state in acceptable_states else 0)
+    successors.append([sink] * len(symbols))
+    labels.append(2)
+
+    block_of = hopcroft_partition(successors, labels)
+
+    # Represent every block by its lexicographically smallest state, exactly
+    # like `get_equivalent_states` does.
+    representatives = {}
+    for state in sorted_reachable_states:
+        representatives.setdefault(block_of[state_ids[state]], state)
+    return {
+        state: representatives[block_of[state_ids[state]]]
+        for state in sorted_reachable_states
+    }
+
+
+class CompactDFA:
+    """Integer-indexed DFA.
+
+    Transitions live in a dense row-major `states x symbols` array of machine
+    ints where -1 marks a missing transition, and acceptance is a packed bit
+    vector.
+    """
+
+    def __init__(
+        self, state_names: list[str], symbols: list[str], start_state: int
+    ) -> None:
+        self.state_names = state_names
+        self.symbols = symbols
+        self.start_state = start_state
+        self.transitions = array("i", [-1]) * (len(state_names) * len(symbols))
+        self.accepting = bytearray((len(state_names) + 7) // 8)
+
+    def set_transition(self, state: int, symbol: int, next_state: int) -> None:
+        self.transitions[state * len(self.symbols) + symbol] = next_state
+
+    def set_accepting(self, state: int) -> None:
+        self.accepting[state >> 3] |= 1 << (state & 7)
+
+    def is_accepting(self, state: int) -> bool:
+        return bool(self.accepting[state >> 3] & (1 << (state & 7)))
+
+    def column(self, symbol: int) -> array:
+        # Targets of `symbol` for all states, in state order
+        return self.transitions[symbol :: len(self.symbols)]
+
+
+def build_compact_dfa(
+    reachable_states: set[str], symbols: list[str] | None = None
+) -> CompactDFA:
+    if symbols is None:
+        symbols = SYMBOLS
+    state_names = sorted(reachable_states)
+    state_ids = {state: index for index, state in enumerate(state_names)}
+    dfa = CompactDFA(state_names, symbols, state_ids[START_STATE])
+
+    for state in ACCEPTABLE_STATES:
+        if state in state_ids:
+            dfa.set_accepting(state_ids[state])
+    for state, state_id in state_ids.items():
+        for symbol_id, symbol in enumerate(symbols):
+            next_state = TRANSITIONS.get((state, symbol))
+            if next_state:
+                dfa.set_transition(state_id, symbol_id, state_ids[next_state])
+    return dfa
+
+
+def moore_partition(dfa: CompactDFA) -> array:
+    # Moore's refinement: each round relabels every state by its signature
+    # (own label, labels of its successors). A label is the index of the first
+    # state seen with the same signature, so labels stay below the state count
+    # and a signature packs into one int, built with `map` over the transition
+    # columns instead of a tuple per state. Partitions only get finer, so an
+    # unchanged class count means the partition is stable.
+    state_count = len(dfa.state_names)
+    labels = array("i", map(dfa.is_accepting, range(state_count)))
+    class_count = len(set(labels))
+    columns = [dfa.column(symbol) for symbol in range(len(dfa.symbols))]
+    # A missing transition (-1) picks up the trailing sink label
+    sink = array("i", [state_count])
+    shift = (state_count + 1).__mul__
+
+    while True:
+        if STATS is not None:
+            STATS.count("moore_rounds")
+        lookup = labels + sink
+        signatures = labels
+        for column in columns:
+            signatures = map(
+                add, map(shift, signatures), map(lookup.__getitem__, column)
+            )
+        signature_ids = {}
+        new_labels = array("i", map(signature_ids.setdefault, signatures, count()))
+        if len(signature_ids) == class_count:
+            return labels
+        labels = new_labels
+        class_count = len(signature_ids)
+
+
+def find_equivalent_states_moore(
+    reachable_states: set[str], symbols: list[str] | None = None
+) -> dict[str, str]:
+    dfa = build_compact_dfa(reachable_states, symbols)
+    labels = moore_partition(dfa)
+
+    # State names are sorted, so the first state seen in a class is the
+    # lexicographically smallest one, as in `get_equivalent_states`.
+    representatives = {}
+    for state, label in zip(dfa.state_names, labels):
+        representatives.setdefault(label, state)
+    return {
+        state: representatives[label] for state, label in zip(dfa.state_names, labels)
+    }
+
+
+def compress_alphabet(
+    reachable_states: set[str],
+) -> tuple[list[str], dict[str, int]]:
+    # Symbols whose transition columns over the reachable states are identical
+    # can never tell two states apart differently, so minimization only needs
+    # one symbol per class. Returns the first symbol of every class and the
+    # symbol -> class lookup table.
+    sorted_reachable_states = sorted(reachable_states)
+    column_classes = {}
+    class_symbols = []
+    symbol_classes = {}
+    for symbol in SYMBOLS:
+        column = tuple(
+            TRANSITIONS.get((state, symbol)) for state in sorted_reachable_states
+        )
+        if column not in column_classes:
+            column_classes[column] = len(class_symbols)
+            class_symbols.append(symbol)
+        symbol_classes[symbol] = column_classes[column]
+    return class_symbols, symbol_classes
+
+
+def find_equivalent_states(
+    reachable_states: set[str],
+    algorithm: str = "hopcroft",
+    symbols: list[str] | None = None,
+) -> dict[str, str]:
+    # Unless told otherwise, run on one representative symbol per alphabet class
+    if symbols is None:
+        symbols, _ = compress_alphabet(reachable_states)
+    if algorithm == "table":
+        distinguishable_table = find_distinguishable_pairs(reachable_states, symbols)
+        return get_equivalent_states(reachable_states, distinguishable_table)
+    if algorithm == "hopcroft":
+        return find_equivalent_states_hopcroft(reachable_states, symbols)
+    if algorithm == "moore":
+        return find_equivalent_states_moore(reachable_states, symbols)
+    raise ValueError(f"Unknown minimization algorithm: {algorithm}")
+
+
 def construct_minimized_dfa(
     reachable_states: set[str], equivalent_states_map: dict[str, str]
 ) -> tuple[list[str], list[str], list[str], str, dict[tuple[str, str], str]]:
@@ -220,55 +525,802 @@ def construct_minimized_dfa(
     )
 
 
+def canonical_dfa_key() -> tuple[str, list[str]]:
+    # Number the reachable states in BFS order from the start state, taking
+    # symbols in sorted order. Isomorphic DFAs get the same numbering whatever
+    # their state names or listing order, so hashing the renumbered DFA
+    # gives a key that identifies it up to renaming.
+    canonical_states = [START_STATE]
+    canonical_ids = {START_STATE: 0}
+    canonical_transitions = array("i")
+    acceptable_states = set(ACCEPTABLE_STATES)
+
+    for state in canonical_states:  # grows while it is being walked
+        for symbol in SYMBOLS:
+            next_state = TRANSITIONS.get((state, symbol))
+            if not next_state:
+                canonical_transitions.append(-1)
+                continue
+            if next_state not in canonical_ids:
+                canonical_ids[next_state] = len(canonical_states)
+                canonical_states.append(next_state)
+            canonical_transitions.append(canonical_ids[next_state])
+
+    if sys.byteorder != "little":
+        canonical_transitions.byteswap()
+    digest = hashlib.sha256()
+    digest.update(json.dumps(SYMBOLS).encode())
+    digest.update(b"\0")
+    digest.update(bytes(state in acceptable_states for state in canonical_states))
+    digest.update(canonical_transitions.tobytes())
+    return digest.hexdigest(), canonical_states
+
+
+def load_cached_partition(
+    cache_dir: str, key: str, state_count: int
+) -> memoryview | None:
+    path = os.path.join(cache_dir, key + CACHE_SUFFIX)
+    try:
+        with open(path, "rb") as cache_file:
+            mapped = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    # A truncated, foreign or damaged file is a miss like a missing one: the
+    # header has to describe `state_count` states and every label has to be
+    # one of their classes
+    header = None
+    if len(mapped) >= CACHE_HEADER.size:
+        with suppress(struct.error):
+            header = CACHE_HEADER.unpack_from(mapped)
+    if (
+        header is None
+        or header[:3] != (CACHE_MAGIC, CACHE_VERSION, CACHE_BYTE_ORDER)
+        or header[3] != state_count
+        or len(mapped) != CACHE_HEADER.size + 4 * state_count
+    ):
+        mapped.close()
+        return None
+    # The view keeps the mapping alive; nothing is copied out of the file
+    labels = memoryview(mapped)[CACHE_HEADER.size :].cast("i")
+    if labels and not 0 <= min(labels) <= max(labels) < state_count:
+        labels.release()
+        mapped.close()
+        return None
+
+    # Eviction drops the least recently used entries first; a read-only cache
+    # just keeps its order
+    with suppress(OSError):
+        os.utime(path)
+    return labels
+
+
+def store_cached_partition(
+    cache_dir: str, key: str, labels: array, max_bytes: int
+) -> None:
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key + CACHE_SUFFIX)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as cache_file:
+        cache_file.write(
+            CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, CACHE_BYTE_ORDER, len(labels))
+        )
+        labels.tofile(cache_file)
+    os.replace(temporary_path, path)
+
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(CACHE_SUFFIX):
+            entry_stat = entry.stat()
+            entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, entry_path in sorted(entries):
+        if total_size <= max_bytes:
+            break
+        os.remove(entry_path)
+        total_size -= size
+
+
+def find_equivalent_states_cached(
+    algorithm: str, cache_dir: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+) -> tuple[set[str], dict[str, str]]:
+    # The cache stores class labels per canonical state, not state names, so
+    # a hit is valid for any renaming of the DFA.
+    key, canonical_states = canonical_dfa_key()
+    reachable_states = set(canonical_states)
+    labels = load_cached_partition(cache_dir, key, len(canonical_states))
+    if STATS is not None:
+        STATS.count("cache_misses" if labels is None else "cache_hits")
+
+    if labels is None:
+        equivalent_states_map = find_equivalent_states(reachable_states, algorithm)
+        label_ids = {}
+        labels = array(
+            "i",
+            (
+                label_ids.setdefault(equivalent_states_map[state], len(label_ids))
+                for state in canonical_states
+            ),
+        )
+        try:
+            store_cached_partition(cache_dir, key, labels, max_bytes)
+        except OSError as error:
+            print(f"Warning: Could not write DFA cache: {error}", file=sys.stderr)
+        return reachable_states, equivalent_states_map
+
+    representatives = {}
+    for state, label in zip(canonical_states, labels):
+        if label not in representatives or state < representatives[label]:
+            representatives[label] = state
+    equivalent_states_map = {
+        state: representatives[label] for state, label in zip(canonical_states, labels)
+    }
+    return reachable_states, equivalent_states_map
+
+
+def minimize_dfa(
+    algorithm: str = "hopcroft",
+    cache_dir: str | None = None,
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+) -> tuple[list[str], list[str], list[str], str, dict[tuple[str, str], str]]:
+    # Full pipeline over the currently loaded DFA
+    if cache_dir is None:
+        reachable_states_set = find_reachable_states()
+        equivalent_states_map = find_equivalent_states(reachable_states_set, algorithm)
+    else:
+        reachable_states_set, equivalent_states_map = find_equivalent_states_cached(
+            algorithm, cache_dir, cache_max_bytes
+        )
+    return construct_minimized_dfa(reachable_states_set, equivalent_states_map)
+
+
+def signature_shape(signature: tuple[int, tuple]) -> tuple[int, tuple]:
+    # The label and the missing transitions of an IncrementalDFA signature
+    label, row = signature
+    return label, tuple(target == MISSING_CLASS for target in row)
+
+
+class IncrementalDFA:
+    """A DFA kept minimized while its transitions and accepting states change.
+
+    Equivalence classes are tracked over all states, reachable or not, each
+    with its signature: its label and the classes its transitions lead to.
+    An edit only marks the edited state dirty. When the minimal DFA is
+    requested, just the states that can reach a dirty state are revisited:
+    every other state keeps its language, so its class is final. Affected
+    states that still have the language of such a class rejoin it; the rest
+    are refined with Hopcroft's algorithm, where each class they lead to is a
+    single distinct node. The work depends on the affected states and their
+    neighbourhood, not on the size of the DFA. `minimized` returns exactly
+    what `minimize_dfa` would for the same DFA.
+    """
+
+    def __init__(
+        self,
+        all_states: list[str],
+        symbols: list[str],
+        acceptable_states: list[str],
+        start_state: str,
+        transitions: dict[tuple[str, str], str],
+    ) -> None:
+        self.symbols = sorted(symbols)
+        self.symbol_set = set(self.symbols)
+        self.start_state = start_state
+        self.acceptable_states = set(acceptable_states)
+        self.states = set(all_states)
+        self.states.add(start_state)
+        self.transitions = {}
+        self.predecessors = defaultdict(set)
+        for (state, symbol), next_state in transitions.items():
+            if symbol in self.symbol_set and next_state:
+                self.states.update((state, next_state))
+                self.transitions[(state, symbol)] = next_state
+                self.predecessors[next_state].add((state, symbol))
+
+        self.class_of = {}
+        self.class_members = {}
+        self.class_signatures = {}
+        self.signature_class = {}
+        # Classes by label and missing transitions, for states that reach no
+        # existing class
+        self.shape_classes = defaultdict(set)
+        self.next_class_id = 0
+        self.dirty_states = set(self.states)
+        self.reachable = set()
+        self.reachability_stale = True
+
+    @classmethod
+    def from_loaded_dfa(cls) -> "IncrementalDFA":
+        return cls(ALL_STATES, SYMBOLS, ACCEPTABLE_STATES, START_STATE, TRANSITIONS)
+
+    def add_transition(self, state: str, symbol: str, next_state: str) -> None:
+        # Adds the transition, replacing an existing one for (state, symbol)
+        if symbol not in self.symbol_set:
+            raise ValueError(f"Symbol {symbol!r} is not in the alphabet")
+        previous_state = self.transitions.get((state, symbol))
+        if previous_state == next_state:
+            return
+        if previous_state is not None:
+            self.remove_transition(state, symbol)
+
+        for new_state in (state, next_state):
+            if new_state not in self.states:
+                self.states.add(new_state)
+                self.dirty_states.add(new_state)
+        self.transitions[(state, symbol)] = next_state
+        self.predecessors[next_state].add((state, symbol))
+        self.dirty_states.add(state)
+        if not self.reachability_stale and state in self.reachable:
+            self.extend_reachable(next_state)
+
+    def remove_transition(self, state: str, symbol: str) -> None:
+        next_state = self.transitions.pop((state, symbol), None)
+        if next_state is None:
+            return
+        self.predecessors[next_state].discard((state, symbol))
+        self.dirty_states.add(state)
+        # Losing an edge can only shrink the reachable set if it left it
+        if state in self.reachable:
+            self.reachability_stale = True
+
+    def toggle_accepting(self, state: str) -> None:
+        if state not in self.states:
+            raise ValueError(f"Unknown state {state!r}")
+        self.acceptable_states ^= {state}
+        self.dirty_states.add(state)
+
+    def extend_reachable(self, state: str) -> None:
+        if state in self.reachable:
+            return
+        self.reachable.add(state)
+        queue = deque([state])
+        while queue:
+            current_state = queue.popleft()
+            for symbol in self.symbols:
+                next_state = self.transitions.get((current_state, symbol))
+                if next_state and next_state not in self.reachable:
+                    self.reachable.add(next_state)
+                    queue.append(next_state)
+
+    def state_label(self, state: str) -> int:
+        return 1 if state in self.acceptable_states else 0
+
+    def next_class(self, state: str, symbol: str) -> int:
+        next_state = self.transitions.get((state, symbol))
+        return MISSING_CLASS if next_state is None else self.class_of[next_state]
+
+    def add_to_class(self, state: str, class_id: int) -> None:
+        self.class_of[state] = class_id
+        self.class_members[class_id].add(state)
+
+    def set_signature(self, class_id: int, signature: tuple[int, tuple]) -> None:
+        self.class_signatures[class_id] = signature
+        self.signature_class[signature] = class_id
+        self.shape_classes[signature_shape(signature)].add(class_id)
+
+    def remove_signature(self, class_id: int) -> None:
+        signature = self.class_signatures.pop(class_id)
+        del self.signature_class[signature]
+        self.shape_classes[signature_shape(signature)].discard(class_id)
+
+    def classes_into(self, class_id: int, symbol: str) -> set[int]:
+        # Classes of unaffected states with a `symbol` edge into `class_id`
+        return {
+            self.class_of[predecessor]
+            for member in self.class_members[class_id]
+            for predecessor, predecessor_symbol in self.predecessors[member]
+            if predecessor_symbol == symbol and predecessor in self.class_of
+        }
+
+    def match_existing_classes(self, affected_states: set[str]) -> dict[str, int]:
+        # Affected states whose language is still that of an existing class.
+        # Successors are class ids, MISSING_CLASS or affected states. Candidate
+        # classes come from the predecessors of a successor class, or of the
+        # candidates of an affected successor; candidates inconsistent with a
+        # successor's candidates are then dropped until none are left.
+        if not self.class_signatures:
+            return {}
+        rows = {}
+        candidates = {}
+        queue = deque()
+        for state in affected_states:
+            row = []
+            for symbol in self.symbols:
+                next_state = self.transitions.get((state, symbol))
+                if next_state in affected_states:
+                    row.append(next_state)
+                else:
+                    row.append(self.next_class(state, symbol))
+            rows[state] = row
+
+            for symbol, target in zip(self.symbols, row):
+                if isinstance(target, int) and target != MISSING_CLASS:
+                    candidates[state] = self.classes_into(target, symbol)
+                    break
+            else:
+                if all(isinstance(target, int) for target in row):
+                    class_id = self.signature_class.get(
+                        (self.state_label(state), tuple(row))
+                    )
+                    candidates[state] = set() if class_id is None else {class_id}
+            if state in candidates:
+                queue.append(state)
+
+        # Affected predecessors inherit candidates from their successors
+        while queue:
+            state = queue.popleft()
+            for predecessor, symbol in self.predecessors[state]:
+                if predecessor not in candidates:
+                    candidates[predecessor] = set().union(
+                        *(
+                            self.classes_into(class_id, symbol)
+                            for class_id in candidates[state]
+                        )
+                    )
+                    queue.append(predecessor)
+        # No class is reachable from the rest, so any class of the same shape
+        # might match them
+        for state in affected_states.difference(candidates):
+            signature = (self.state_label(state), tuple(rows[state]))
+            candidates[state] = set(self.shape_classes[signature_shape(signature)])
+
+        def consistent(state: str, class_id: int) -> bool:
+            label, class_row = self.class_signatures[class_id]
+            if label != self.state_label(state):
+                return False
+            return all(
+                class_target in candidates[target]
+                if isinstance(target, str)
+                else class_target == target
+                for target, class_target in zip(rows[state], class_row)
+            )
+
+        queue = deque(candidates)
+        queued = set(candidates)
+        while queue:
+            state = queue.popleft()
+            queued.discard(state)
+            classes = candidates[state]
+            rejected = {
+                class_id for class_id in classes if not consistent(state, class_id)
+            }
+            if rejected:
+                classes -= rejected
+                for predecessor, _ in self.predecessors[state]:
+                    if predecessor not in queued:
+                        queued.add(predecessor)
+                        queue.append(predecessor)
+        return {
+            state: next(iter(classes))
+            for state, classes in candidates.items()
+            if classes
+        }
+
+    def refresh_partition(self) -> None:
+        # States whose language may have changed: everything that can reach
+        # an edited state.
+        affected_states = set(self.dirty_states)
+        queue = deque(affected_states)
+        while queue:
+            for predecessor, _ in self.predecessors[queue.popleft()]:
+                if predecessor not in affected_states:
+                    affected_states.add(predecessor)
+                    queue.append(predecessor)
+        self.dirty_states.clear()
+        if 2 * len(affected_states) > len(self.states):
+            # Matching most states against the few remaining classes costs
+            # more than partitioning everything again
+            affected_states = set(self.states)
+
+        # Unaffected states only lead to unaffected states, so their classes
+        # are final and keep their signatures.
+        for state in affected_states:
+            old_class = self.class_of.pop(state, None)
+            if old_class is not None:
+                members = self.class_members[old_class]
+                members.discard(state)
+                if not members:
+                    del self.class_members[old_class]
+                    self.remove_signature(old_class)
+
+        matches = self.match_existing_classes(affected_states)
+        for state, class_id in matches.items():
+            self.add_to_class(state, class_id)
+
+        # None of the other affected states matches an existing class, so the
+        # classes they lead to enter hopcroft_partition as distinct nodes
+        nodes = sorted(affected_states.difference(matches))
+        if not nodes:
+            return
+        node_ids = {state: index for index, state in enumerate(nodes)}
+        sink = len(nodes)
+        class_nodes = {}
+
+        def node_of(next_state: str | None) -> int:
+            if next_state is None:
+                return sink
+            if next_state in node_ids:
+                return node_ids[next_state]
+            return class_nodes.setdefault(
+                self.class_of[next_state], sink + 1 + len(class_nodes)
+            )
+
+        successors = [
+            [node_of(self.transitions.get((state, symbol))) for symbol in self.symbols]
+            for state in nodes
+        ]
+        labels = [self.state_label(state) for state in nodes]
+        successors.append([sink] * len(self.symbols))
+        labels.append(2)
+        for index in range(len(class_nodes)):
+            successors.append([sink] * len(self.symbols))
+            labels.append(3 + index)
+
+        block_of = hopcroft_partition(successors, labels)
+
+        # Every block of affected states becomes a new class
+        node_classes = [MISSING_CLASS] * len(successors)
+        for class_id, index in class_nodes.items():
+            node_classes[index] = class_id
+        block_classes = {}
+        class_rows = {}
+        for index, state in enumerate(nodes):
+            block = block_of[index]
+            if block not in block_classes:
+                block_classes[block] = self.next_class_id
+                class_rows[self.next_class_id] = index
+                self.class_members[self.next_class_id] = set()
+                self.next_class_id += 1
+            node_classes[index] = block_classes[block]
+            self.add_to_class(state, block_classes[block])
+        for class_id, index in class_rows.items():
+            self.set_signature(
+                class_id,
+                (
+                    labels[index],
+                    tuple(node_classes[next_node] for next_node in successors[index]),
+                ),
+            )
+
+    def minimized(
+        self,
+    ) -> tuple[list[str], list[str], list[str], str, dict[tuple[str, str], str]]:
+        if self.dirty_states:
+            self.refresh_partition()
+        if self.reachability_stale:
+            self.reachable = set()
+            self.extend_reachable(self.start_state)
+            self.reachability_stale = False
+
+        representatives = {}
+        for state in self.reachable:
+            class_id = self.class_of[state]
+            if class_id not in representatives or state < representatives[class_id]:
+                representatives[class_id] = state
+        new_states = sorted(representatives.values())
+
+        final_transition_table = {}
+        for state in new_states:
+            for symbol in self.symbols:
+                next_state = self.transitions.get((state, symbol))
+                if next_state:
+                    final_transition_table[(state, symbol)] = representatives[
+                        self.class_of[next_state]
+                    ]
+
+        return (
+            new_states,
+            self.symbols,
+            sorted(
+                {
+                    representatives[self.class_of[state]]
+                    for state in self.acceptable_states & self.reachable
+                }
+            ),
+            representatives[self.class_of[self.start_state]],
+            final_transition_table,
+        )
+
+
 def print_minimized_dfa(
     new_states: list[str],
     symbols: list[str],
     final_acceptable_states: list[str],
     final_start_state: str,
     final_transition_table: dict[tuple[str, str], str],
+    file: TextIO | None = None,
 ) -> None:
     """
-    Prints the minimized DFA definition to standard output.
+    Prints the minimized DFA definition to `file`, standard output by default.
     """
-    print(",".join(new_states))
-    print(",".join(symbols))
-    print(",".join(final_acceptable_states))
-    print(final_start_state)
+    print(",".join(new_states), file=file)
+    print(",".join(symbols), file=file)
+    print(",".join(final_acceptable_states), file=file)
+    print(final_start_state, file=file)
 
     # Sort transitions for consistent output
     sorted_transitions = sorted(final_transition_table.items())
 
     for (state, symbol), next_state in sorted_transitions:
-        print(f"{state},{symbol}->{next_state}")
+        print(f"{state},{symbol}->{next_state}", file=file)
 
 
-if __name__ == "__main__":
-    # Read all lines from stdin
-    input_data = [line.strip() for line in sys.stdin.readlines()]
-
-    parse_dfa_input(input_data)
-    reachable_states_set = find_reachable_states()
-
-    # Filter acceptable states to only include reachable ones, and sort them
-    # This is handled within construct_minimized_dfa now for consistency.
-    # reachable_acceptable_states = sorted([s for s in ACCEPTABLE_STATES if s in reachable_states_set])
-    distinguishable_table = find_distinguishable_pairs(reachable_states_set)
-    equivalent_states_map = get_equivalent_states(
-        reachable_states_set, distinguishable_table
+def minimize_served_dfa(
+    definition_lines: list[str],
+    algorithm: str,
+    cache_dir: str | None,
+    cache_max_bytes: int,
+) -> bytes:
+    # The whole request is the DFA, so the minimized definition is its answer.
+    # Uses the module globals; the server compiles one DFA at a time.
+    parse_dfa_input(definition_lines)
+    output = io.StringIO()
+    print_minimized_dfa(
+        *minimize_dfa(algorithm, cache_dir, cache_max_bytes), file=output
     )
+    return output.getvalue().encode()
 
-    (
-        new_states,
-        final_symbols,
-        final_acceptable_states,
-        final_start_state,
-        final_transition_table,
-    ) = construct_minimized_dfa(reachable_states_set, equivalent_states_map)
 
-    print_minimized_dfa(
-        new_states,
-        final_symbols,
-        final_acceptable_states,
-        final_start_state,
-        final_transition_table,
+def answer_minimized_dfa(minimized_dfa: bytes, query_lines: list[str]) -> bytes:
+    return minimized_dfa
+
+
+class DenseDFA:
+    """Flat integer transition table of a minimized DFA, built for running input.
+
+    Columns are alphabet classes: symbols with identical columns in the
+    minimized DFA share one, and `symbol_ids` maps every symbol to its class.
+    A state is stored premultiplied by the row width, so one step is a single
+    list lookup `table[state + symbol_class]`. The last column of each row
+    takes symbols outside the alphabet, and the extra last row is a rejecting
+    sink that also stands in for missing transitions.
+    """
+
+    def __init__(
+        self,
+        new_states: list[str],
+        symbols: list[str],
+        final_acceptable_states: list[str],
+        final_start_state: str,
+        final_transition_table: dict[tuple[str, str], str],
+    ) -> None:
+        column_classes = {}
+        self.symbol_ids = {}
+        for symbol in symbols:
+            column = tuple(
+                final_transition_table.get((state, symbol)) for state in new_states
+            )
+            self.symbol_ids[symbol] = column_classes.setdefault(
+                column, len(column_classes)
+            )
+        self.unknown_symbol = len(column_classes)
+        self.width = len(column_classes) + 1
+        state_ids = {
+            state: index * self.width for index, state in enumerate(new_states)
+        }
+        sink = len(new_states) * self.width
+
+        self.table = [sink] * (sink + self.width)
+        for (state, symbol), next_state in final_transition_table.items():
+            self.table[state_ids[state] + self.symbol_ids[symbol]] = state_ids[
+                next_state
+            ]
+        self.accepting = bytearray(sink + self.width)
+        for state in final_acceptable_states:
+            self.accepting[state_ids[state]] = 1
+        self.start_state = state_ids[final_start_state]
+
+        # Alphabets of single-byte symbols can be mapped with bytes.translate
+        self.byte_columns = None
+        encoded_symbols = [symbol.encode() for symbol in symbols]
+        if all(len(symbol) == 1 and symbol != b"," for symbol in encoded_symbols):
+            columns = bytearray([self.unknown_symbol]) * 256
+            for symbol, encoded_symbol in zip(symbols, encoded_symbols):
+                columns[encoded_symbol[0]] = self.symbol_ids[symbol]
+            self.byte_columns = bytes(columns)
+
+    def accepts(self, line: bytes) -> bool:
+        table = self.table
+        state = self.start_state
+        # "x,y,z": one byte per symbol with commas at every odd position
+        if (
+            self.byte_columns is not None
+            and len(line) % 2
+            and line[1::2] == b"," * (len(line) // 2)
+        ):
+            for symbol in line[::2].translate(self.byte_columns):
+                state = table[state + symbol]
+        else:
+            symbol_ids = self.symbol_ids
+            unknown_symbol = self.unknown_symbol
+            for symbol in line.split(b","):
+                state = table[state + symbol_ids.get(symbol.decode(), unknown_symbol)]
+        return bool(self.accepting[state])
+
+
+def run_dfa_file(dense_dfa: DenseDFA, input_path: str, output) -> None:
+    # One comma-separated symbol sequence per line; prints 1 or 0 for each.
+    with open(input_path, "rb") as input_file:
+        if os.fstat(input_file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            results = bytearray()
+            for line in iter(mapped.readline, b""):
+                results += b"1\n" if dense_dfa.accepts(line.rstrip(b"\r\n")) else b"0\n"
+                if len(results) >= RUN_OUTPUT_BATCH:
+                    output.write(results)
+                    results.clear()
+            output.write(results)
+
+
+def apply_edit_file(
+    incremental_dfa: IncrementalDFA, input_path: str, output: TextIO
+) -> None:
+    # One edit per line: "p,a->q" sets a transition, "p,a->" removes it and a
+    # lone state name toggles whether it accepts. Every empty line and the end
+    # of the file print the minimized DFA, with an empty line between DFAs.
+    printed = False
+    with open(input_path) as input_file:
+        for line in chain(input_file, [""]):
+            line = line.strip()
+            if line and "->" not in line:
+                incremental_dfa.toggle_accepting(line)
+            elif line:
+                transition, next_state = line.split("->", 1)
+                state, separator, symbol = transition.partition(",")
+                if not separator:
+                    raise ValueError(f"Malformed edit {line!r}")
+                if next_state:
+                    incremental_dfa.add_transition(state, symbol, next_state)
+                else:
+                    incremental_dfa.remove_transition(state, symbol)
+            else:
+                if printed:
+                    print(file=output)
+                print_minimized_dfa(*incremental_dfa.minimized(), file=output)
+                printed = True
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Minimize a DFA read from standard input."
+    )
+    argument_parser.add_argument(
+        "--algorithm",
+        choices=MINIMIZATION_ALGORITHMS,
+        default="hopcroft",
+        help="Hopcroft partition refinement (default), Moore refinement on a "
+        "compact array-backed DFA, or the pair table",
+    )
+    argument_parser.add_argument(
+        "--cache-dir",
+        help="directory of a persistent cache of minimization results, keyed by "
+        "the DFA's structure independently of state names",
+    )
+    argument_parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES,
+        help="size limit of the cache directory; least recently used entries "
+        "are evicted first",
+    )
+    argument_parser.add_argument(
+        "--run",
+        metavar="FILE",
+        help="instead of printing the minimized DFA, run every line of FILE "
+        "(comma-separated symbols) through it and print 1 or 0 per line",
+    )
+    argument_parser.add_argument(
+        "--edits",
+        metavar="FILE",
+        help="instead of printing the minimized DFA once, apply the edits in FILE "
+        "to it and print the minimized DFA after each block of edits",
     )
+    argument_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="report counters and per-phase wall times as JSON on standard error",
+    )
+    argument_parser.add_argument(
+        "--serve",
+        metavar="SOCKET",
+        help="instead of reading standard input, answer requests sent to the Unix "
+        "socket SOCKET, keeping minimized DFAs in memory between requests",
+    )
+    argument_parser.add_argument(
+        "--served-automata",
+        type=int,
+        default=DEFAULT_SERVED_AUTOMATA,
+        help="maximum number of minimized DFAs kept by --serve",
+    )
+    arguments = argument_parser.parse_args()
+    if arguments.serve and (arguments.run or arguments.stats or arguments.edits):
+        argument_parser.error(
+            "--serve cannot be combined with --run, --stats or --edits"
+        )
+    if arguments.edits and (arguments.run or arguments.cache_dir):
+        argument_parser.error("--edits cannot be combined with --run or --cache-dir")
+    if arguments.served_automata < 1:
+        argument_parser.error("--served-automata must be at least 1")
+    if arguments.stats:
+        STATS = Stats("MinDKA")
+
+    if arguments.serve:
+        # asyncio costs about 10 MiB and 20 ms at startup, so only --serve
+        # imports the server
+        from common.server import serve
+
+        serve(
+            arguments.serve,
+            0,
+            partial(
+                minimize_served_dfa,
+                algorithm=arguments.algorithm,
+                cache_dir=arguments.cache_dir,
+                cache_max_bytes=arguments.cache_max_bytes,
+            ),
+            answer_minimized_dfa,
+            arguments.served_automata,
+        )
+        sys.exit()
+
+    with timed_phase(STATS, "parse"):
+        # Read all lines from stdin
+        input_data = read_lines(sys.stdin)
+
+        parse_dfa_input(input_data)
+
+    if arguments.edits:
+        with timed_phase(STATS, "simulate"):
+            try:
+                apply_edit_file(
+                    IncrementalDFA.from_loaded_dfa(), arguments.edits, sys.stdout
+                )
+            except ValueError as e:
+                print(f"Error: Invalid edit: {e}", file=sys.stderr)
+                sys.exit(1)
+        with timed_phase(STATS, "output"):
+            sys.stdout.flush()
+        if STATS is not None:
+            STATS.report()
+        sys.exit()
+
+    with timed_phase(STATS, "compile"):
+        (
+            new_states,
+            final_symbols,
+            final_acceptable_states,
+            final_start_state,
+            final_transition_table,
+        ) = minimize_dfa(
+            arguments.algorithm, arguments.cache_dir, arguments.cache_max_bytes
+        )
+    if STATS is not None:
+        STATS.count("minimized_states", len(new_states))
+
+    if arguments.run:
+        with timed_phase(STATS, "compile"):
+            dense_dfa = DenseDFA(
+                new_states,
+                final_symbols,
+                final_acceptable_states,
+                final_start_state,
+                final_transition_table,
+            )
+        with timed_phase(STATS, "simulate"):
+            run_dfa_file(dense_dfa, arguments.run, sys.stdout.buffer)
+        with timed_phase(STATS, "output"):
+            sys.stdout.buffer.flush()
+    else:
+        with timed_phase(STATS, "output"):
+            print_minimized_dfa(
+                new_states,
+                final_symbols,
+                final_acceptable_states,
+                final_start_state,
+                final_transition_table,
+            )
+            sys.stdout.flush()
+
+    if STATS is not None:
+        STATS.report()
@@ -1,13 +1,13 @@
 #!/bin/bash
 
-num_tests=$(ls -l testovi | grep -c ^d)
+num_tests=$(ls -d testovi/test*/ | wc -l)
 
 for i in $(seq 1 $num_tests)  # iterate over the number of test cases
 do
     dir=$(printf "%02d\n" $i)
     echo "Test $dir"
 
-    res=$(python MinDKA.py < "testovi/test$dir/t.ul" | diff "testovi/test$dir/t.iz" -)
+    res=$(python MinDKA.py "$@" < "testovi/test$dir/t.ul" | diff "testovi/test$dir/t.iz" -)
     if [ "$res" != "" ]
     then
         echo "FAIL $res"
@@ -15,3 +15,95 @@ do
         echo "OK"
     fi
 done
+
+# EnkaToDKA on the epsilon-NFA inputs of SimEnka: the printed DFA, then --run
+num_tests=$(ls -d testovi/enka/test*/ | wc -l)
+
+for i in $(seq 1 $num_tests)
+do
+    dir=$(printf "%02d\n" $i)
+    echo "EnkaToDKA test $dir"
+
+    res=$(python EnkaToDKA.py "$@" < "testovi/enka/test$dir/test.a" | diff "testovi/enka/test$dir/test.b" -)
+    res+=$(python EnkaToDKA.py --run "$@" < "testovi/enka/test$dir/test.a" | diff "testovi/enka/test$dir/test.c" -)
+    if [ "$res" != "" ]
+    then
+        echo "FAIL $res"
+    else
+        echo "OK"
+    fi
+done
+
+# IncrementalDFA: the minimized DFA after each block of edits, as a full run
+# on the edited DFA prints it
+num_tests=$(ls -d testovi/edits/test*/ | wc -l)
+
+for i in $(seq 1 $num_tests)
+do
+    dir=$(printf "%02d\n" $i)
+    echo "Edits test $dir"
+
+    res=$(python MinDKA.py --edits "testovi/edits/test$dir/izmjene" "$@" < "testovi/edits/test$dir/t.ul" | diff "testovi/edits/test$dir/t.iz" -)
+    if [ "$res" != "" ]
+    then
+        echo "FAIL $res"
+    else
+        echo "OK"
+    fi
+done
+
+# --run: one 1 or 0 per line of nizovi, over single-byte alphabets (the
+# bytes.translate path), multi-character and non-ASCII symbols, unknown symbols
+# and CRLF line endings
+num_tests=$(ls -d testovi/run/test*/ | wc -l)
+
+for i in $(seq 1 $num_tests)
+do
+    dir=$(printf "%02d\n" $i)
+    echo "Run test $dir"
+
+    res=$(python MinDKA.py --run "testovi/run/test$dir/nizovi" "$@" < "testovi/run/test$dir/t.ul" | diff "testovi/run/test$dir/t.iz" -)
+    if [ "$res" != "" ]
+    then
+        echo "FAIL $res"
+    else
+        echo "OK"
+    fi
+done
+
+# --cache-dir: every DFA runs twice in one cache directory shared by all tests,
+# which starts with the damaged entries in zapisi/; t.hit says whether each
+# run should find its partition in the cache
+cache_dir=$(mktemp -d)
+num_tests=$(ls -d testovi/cache/test*/ | wc -l)
+
+for i in $(seq 1 $num_tests)
+do
+    dir=$(printf "%02d\n" $i)
+    echo "Cache test $dir"
+
+    if [ -d "testovi/cache/test$dir/zapisi" ]
+    then
+        cp testovi/cache/test$dir/zapisi/* "$cache_dir"
+    fi
+    res=""
+    hits=""
+    for run in 1 2
+    do
+        res+=$(python MinDKA.py --cache-dir "$cache_dir" --stats "$@" < "testovi/cache/test$dir/t.ul" 2> "$cache_dir/stats" | diff "testovi/cache/test$dir/t.iz" -)
+        if grep -q '"cache_hits"' "$cache_dir/stats"
+        then
+            hits+="hit"$'\n'
+        else
+            hits+="miss"$'\n'
+        fi
+    done
+    res+=$(printf "%s" "$hits" | diff "testovi/cache/test$dir/t.hit" -)
+    if [ "$res" != "" ]
+    then
+        echo "FAIL $res"
+    else
+        echo "OK"
+    fi
+done
+rm -r "$cache_dir"
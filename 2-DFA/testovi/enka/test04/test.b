@@ -0,0 +1,19 @@
+p0,p1,p2,p3,p4
+a,b,c
+p1,p2
+p0
+p0,a->p1
+p0,b->p2
+p0,c->p3
+p1,a->p3
+p1,b->p0
+p1,c->p4
+p2,a->p0
+p2,b->p4
+p2,c->p0
+p3,a->p4
+p3,b->p1
+p3,c->p4
+p4,a->p2
+p4,b->p3
+p4,c->p0
@@ -0,0 +1,36 @@
+p0,p1,p10,p11,p2,p3,p4,p5,p6,p7,p9
+a,b,c
+p1,p10,p11,p2,p5,p7,p9
+p0
+p0,a->p1
+p0,b->p2
+p0,c->p3
+p1,a->p4
+p1,b->p0
+p1,c->p5
+p10,a->p7
+p10,b->p9
+p10,c->p11
+p11,a->p11
+p11,b->p11
+p11,c->p11
+p2,a->p0
+p2,b->p6
+p3,a->p5
+p3,b->p7
+p3,c->p11
+p4,a->p6
+p4,b->p1
+p4,c->p5
+p5,a->p9
+p5,b->p3
+p5,c->p9
+p6,a->p2
+p6,b->p4
+p6,c->p9
+p7,a->p3
+p7,b->p10
+p7,c->p5
+p9,a->p10
+p9,b->p5
+p9,c->p3
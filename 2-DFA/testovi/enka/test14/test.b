@@ -0,0 +1,39 @@
+p0,p1,p10,p17,p18,p19,p2,p22,p3,p4,p7,p8
+a,b,c,d
+p1,p10,p18,p2,p22,p8
+p0
+p0,a->p1
+p0,b->p2
+p0,c->p3
+p1,a->p4
+p1,b->p10
+p1,c->p10
+p10,a->p10
+p10,b->p10
+p10,c->p10
+p17,a->p10
+p17,b->p22
+p17,c->p10
+p18,a->p10
+p18,b->p8
+p18,c->p3
+p19,a->p10
+p19,b->p10
+p19,c->p10
+p2,a->p0
+p2,b->p7
+p22,a->p19
+p22,b->p10
+p22,c->p10
+p3,a->p7
+p3,b->p1
+p3,c->p8
+p4,a->p8
+p4,b->p10
+p4,c->p10
+p7,a->p2
+p7,b->p17
+p7,c->p18
+p8,a->p18
+p8,b->p19
+p8,c->p18
@@ -0,0 +1,83 @@
+p0,p1,p10,p11,p12,p13,p14,p15,p16,p17,p18,p19,p2,p20,p21,p3,p4,p5,p6,p7,p8,p9
+a,b,c,d
+p1,p11,p12,p15,p16,p17,p18,p19,p2,p21,p4,p5,p7,p8,p9
+p0
+p0,a->p1
+p0,b->p2
+p0,c->p3
+p0,d->p3
+p1,b->p4
+p1,c->p5
+p1,d->p6
+p10,a->p1
+p10,b->p4
+p10,c->p16
+p10,d->p14
+p11,a->p8
+p11,b->p17
+p11,c->p18
+p11,d->p14
+p12,a->p8
+p12,b->p11
+p12,c->p19
+p12,d->p20
+p13,b->p14
+p13,c->p15
+p14,a->p1
+p14,b->p17
+p14,c->p18
+p14,d->p14
+p15,a->p8
+p15,b->p2
+p15,c->p3
+p15,d->p3
+p16,a->p8
+p16,b->p4
+p16,c->p16
+p16,d->p14
+p17,a->p0
+p17,b->p4
+p17,c->p5
+p17,d->p6
+p18,a->p0
+p18,b->p8
+p18,c->p21
+p18,d->p0
+p19,a->p8
+p19,b->p4
+p19,c->p19
+p19,d->p10
+p2,a->p0
+p20,b->p8
+p20,c->p21
+p20,d->p0
+p21,a->p8
+p21,b->p11
+p21,c->p11
+p21,d->p3
+p3,b->p1
+p3,c->p7
+p3,d->p0
+p4,a->p8
+p4,b->p4
+p4,c->p9
+p4,d->p10
+p5,a->p0
+p5,b->p11
+p5,c->p12
+p5,d->p13
+p6,a->p1
+p6,b->p11
+p6,c->p11
+p6,d->p3
+p7,a->p0
+p7,b->p14
+p7,c->p15
+p8,a->p1
+p8,b->p4
+p8,c->p9
+p8,d->p10
+p9,a->p0
+p9,b->p4
+p9,c->p12
+p9,d->p6
@@ -0,0 +1,16 @@
+p0,p1,p2,p3,p5,p6
+a,dugackiznakabecede12,lab2,lala,pnp,utr
+p5,p6
+p0
+p0,a->p1
+p0,dugackiznakabecede12->p2
+p0,pnp->p3
+p1,a->p1
+p2,a->p1
+p2,lab2->p5
+p2,utr->p6
+p3,a->p1
+p3,lab2->p5
+p5,utr->p6
+p6,a->p1
+p6,lab2->p5
@@ -0,0 +1,87 @@
+p0,p1,p10,p11,p12,p13,p14,p15,p16,p17,p18,p19,p2,p20,p21,p3,p4,p5,p6,p7,p8,p9
+a,b,c,d
+p11,p12,p13,p14,p16,p18,p19,p2,p20,p4,p5,p6,p7,p8,p9
+p0
+p0,a->p1
+p0,b->p2
+p0,c->p3
+p0,d->p3
+p1,a->p1
+p1,b->p4
+p1,c->p5
+p1,d->p1
+p10,a->p15
+p10,b->p12
+p10,c->p18
+p10,d->p3
+p11,a->p15
+p11,b->p11
+p11,c->p11
+p11,d->p15
+p12,a->p15
+p12,b->p12
+p12,c->p18
+p12,d->p3
+p13,a->p1
+p13,b->p2
+p13,c->p3
+p13,d->p3
+p14,a->p15
+p14,b->p11
+p14,c->p19
+p14,d->p10
+p15,a->p15
+p15,b->p11
+p15,c->p20
+p15,d->p1
+p16,a->p1
+p16,b->p13
+p16,c->p6
+p16,d->p21
+p17,a->p17
+p17,b->p10
+p17,c->p13
+p18,a->p1
+p18,b->p4
+p18,c->p5
+p18,d->p1
+p19,a->p15
+p19,b->p12
+p19,c->p8
+p19,d->p21
+p2,a->p0
+p2,b->p2
+p20,a->p15
+p20,b->p11
+p20,c->p20
+p20,d->p1
+p21,a->p17
+p21,b->p11
+p21,c->p12
+p21,d->p0
+p3,b->p6
+p3,c->p7
+p3,d->p0
+p4,a->p1
+p4,b->p8
+p4,c->p9
+p4,d->p10
+p5,a->p10
+p5,b->p11
+p5,c->p12
+p5,d->p0
+p6,a->p3
+p6,b->p8
+p6,c->p9
+p6,d->p10
+p7,a->p10
+p7,b->p12
+p7,c->p13
+p8,a->p1
+p8,b->p8
+p8,c->p14
+p8,d->p15
+p9,a->p15
+p9,b->p12
+p9,c->p16
+p9,d->p17
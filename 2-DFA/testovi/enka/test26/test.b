@@ -0,0 +1,4 @@
+p0
+a,b,c
+p0
+p0
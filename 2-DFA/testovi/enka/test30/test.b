@@ -0,0 +1,39 @@
+p0,p1,p10,p2,p3,p4,p5,p6,p9
+a,b,c,d
+p1,p10,p2,p3,p4,p6
+p0
+p0,a->p0
+p0,b->p1
+p0,c->p2
+p0,d->p0
+p1,a->p0
+p1,b->p3
+p1,c->p4
+p1,d->p5
+p10,a->p0
+p10,b->p1
+p10,c->p2
+p10,d->p0
+p2,a->p5
+p2,b->p6
+p2,c->p2
+p2,d->p0
+p3,a->p0
+p3,b->p3
+p3,c->p6
+p3,d->p5
+p4,a->p5
+p4,b->p2
+p4,c->p3
+p4,d->p9
+p5,a->p5
+p5,b->p6
+p5,c->p2
+p5,d->p0
+p6,a->p5
+p6,b->p6
+p6,c->p6
+p6,d->p5
+p9,a->p9
+p9,b->p5
+p9,c->p10
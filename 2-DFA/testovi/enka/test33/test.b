@@ -0,0 +1,10 @@
+p0,p1
+a,b,c,d
+p1
+p0
+p0,a->p1
+p0,d->p1
+p1,a->p1
+p1,b->p1
+p1,c->p1
+p1,d->p1
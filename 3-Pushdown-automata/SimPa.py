@@ -1,7 +1,38 @@
-from collections import deque
-from re import match
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+from functools import partial
 from sys import stdin
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.loader import (
+    DEFAULT_SERVED_AUTOMATA,
+    PDA_TRANSITION,
+    paused_garbage_collection,
+    read_lines,
+    split_transition_lines,
+)
+from common.stats import Stats, timed_phase
+from common.streaming import (
+    detach_first_line,
+    iter_input_sequences,
+    open_binary_output,
+)
+
+# Encoding of the trace, which is written as bytes
+OUTPUT_ENCODING = sys.stdout.encoding or "utf-8"
+INITIAL_STACK_CAPACITY = 64
+
+# Instrumentation of the run, set only with `--stats`
+STATS = None
+
+# Automaton definition and simulation function of a `--jobs` worker process,
+# set by `init_worker`
+WORKER_AUTOMATON = None
+WORKER_SIMULATE = None
+
 
 def parse_input_data(input_str):
     """Return formatted array of alphabet symbols."""
@@ -10,48 +41,144 @@ def parse_input_data(input_str):
 
 def get_transitions(transition_lines):
     """Return formatted `dict` of transition functions (delta)."""
-    transitions = {}
-
-    for line in transition_lines:
-        if match_result := match(r"^(.+?),(.+?),(.+?)->(.+?),(.+?)$", line):
-            current_state, input_symbol, stack_symbol, new_state, stack_string = (
-                match_result.groups()
-            )
-            transitions[(current_state, input_symbol, stack_symbol)] = (
-                new_state,
-                stack_string,
+    states, input_symbols, stack_symbols, new_states, stack_strings = (
+        split_transition_lines(transition_lines, PDA_TRANSITION, warn=False)
+    )
+    with paused_garbage_collection():
+        return dict(
+            zip(
+                zip(states, input_symbols, stack_symbols),
+                zip(new_states, stack_strings),
             )
+        )
+
+
+def get_nondeterministic_transitions(transition_lines):
+    """Return formatted `dict` of transition relations, with a `list` of all
+    `(new_state, stack_string)` targets of each key in input order.
+    """
+    states, input_symbols, stack_symbols, new_states, stack_strings = (
+        split_transition_lines(transition_lines, PDA_TRANSITION, warn=False)
+    )
+    transitions = {}
+    with paused_garbage_collection():
+        for key, target in zip(
+            zip(states, input_symbols, stack_symbols), zip(new_states, stack_strings)
+        ):
+            targets = transitions.setdefault(key, [])
+            if target not in targets:
+                targets.append(target)
     return transitions
 
 
-class PushdownStack(deque):
-    """A stack implementation using `deque` for efficient append and pop operations."""
+def parse_automaton(definition_lines, nondeterministic=False):
+    """Return the automaton defined by the input lines after the input strings
+    and whether it needs the nondeterministic simulation.
+
+    The automaton is the `tuple` of arguments the simulation functions take
+    after the input strings. With `nondeterministic`, transitions are read as
+    relations, but an automaton that turns out to be deterministic gets plain
+    transition functions again.
+    """
+    all_states = definition_lines[0].split(",")
+    symbols = definition_lines[1].split(",")
+    stack_symbols = definition_lines[2].split(",")
+    acceptable_states = definition_lines[3].split(",")
+    starting_state = definition_lines[4]
+    starting_stack = definition_lines[5]
+    if nondeterministic:
+        transitions = get_nondeterministic_transitions(definition_lines[6:])
+        # The deterministic simulation always prefers an epsilon transition,
+        # so one next to an input transition is a nondeterministic choice too
+        nondeterministic = any(
+            len(targets) > 1
+            or (input_symbol != "$" and (state, "$", top) in transitions)
+            for (state, input_symbol, top), targets in transitions.items()
+        )
+        if not nondeterministic:
+            transitions = {key: targets[0] for key, targets in transitions.items()}
+    else:
+        transitions = get_transitions(definition_lines[6:])
+    automaton = (
+        all_states,
+        symbols,
+        stack_symbols,
+        acceptable_states,
+        starting_state,
+        starting_stack,
+        transitions,
+    )
+    return automaton, nondeterministic
+
+
+class PushdownStack:
+    """A stack that keeps its trace representation up to date as it changes.
+
+    The encoded symbols fill the end of a `bytearray` with the top symbol
+    first, so the representation is the filled part of the buffer and never
+    has to be rebuilt. Pushes and pops only touch the symbols they change.
+    """
 
-    def __init__(self):
-        """Initialize a `PushdownStack` object."""
-        super().__init__()
+    def __init__(self, encoding: str = OUTPUT_ENCODING):
+        """Initialize an empty `PushdownStack` object."""
+        self.encoding = encoding
+        self.buffer = bytearray(INITIAL_STACK_CAPACITY)
+        self.top_offset = len(self.buffer)
+        self.symbols = []
+
+    def __len__(self) -> int:
+        """Return the number of symbols on the stack."""
+        return len(self.symbols)
 
     def __repr__(self) -> str:
         """Return a string representation of the stack."""
-        return "$" if not self else "".join(reversed(self))
+        return "$" if not self.symbols else self.render().decode(self.encoding)
+
+    def render(self) -> bytes | memoryview:
+        """Return the encoded string representation of the stack without copying it."""
+        if not self.symbols:
+            return b"$"
+        return memoryview(self.buffer)[self.top_offset :]
 
     def push(self, item: str) -> None:
-        """Push `item` onto the stack."""
-        for symbol in reversed(item):
-            if symbol != "$":
-                self.append(symbol)
-            else:
-                break
+        """Push `item` onto the stack, its first symbol ending up on top.
+
+        Symbols up to and including the last `$` in `item` are ignored.
+        """
+        pushed = item[item.rfind("$") + 1 :]
+        if not pushed:
+            return
+        encoded = pushed.encode(self.encoding)
+        if len(encoded) > self.top_offset:
+            # Move the symbols to the end of a buffer at least twice as large
+            used = len(self.buffer) - self.top_offset
+            capacity = max(2 * len(self.buffer), used + len(encoded))
+            buffer = bytearray(capacity)
+            buffer[capacity - used :] = self.buffer[self.top_offset :]
+            self.buffer = buffer
+            self.top_offset = capacity - used
+        self.buffer[self.top_offset - len(encoded) : self.top_offset] = encoded
+        self.top_offset -= len(encoded)
+        self.symbols.extend(reversed(pushed))
 
     def pop_left(self) -> str:
         """Pop and return the top element from the stack."""
-        return self.pop()
+        symbol = self.symbols.pop()
+        self.top_offset += len(symbol.encode(self.encoding))
+        return symbol
 
     def is_empty(self) -> bool:
         """Return `True` if the stack is empty."""
         return not bool(self)
 
 
+def write_step(output, state, stack):
+    """Write the trace step `state#stack|` to the binary `output`."""
+    output.write(f"{state}#".encode(OUTPUT_ENCODING))
+    output.write(stack.render())
+    output.write(b"|")
+
+
 def simulate_pushdown_automaton(
     input_strings,
     all_states,
@@ -61,14 +188,21 @@ def simulate_pushdown_automaton(
     starting_state,
     starting_stack,
     transitions,
+    output=sys.stdout.buffer,
 ):
-    """Simulate the pushdown automaton for each input string."""
+    """Simulate the pushdown automaton for each input string.
+
+    The encoded trace of every string is written to the binary `output`.
+    """
+    stats = STATS
     for string in input_strings:
         stack = PushdownStack()
         current_state = starting_state
         current_stack_symbol = starting_stack
         fail = False
-        print(f"{current_state}#{current_stack_symbol}|", end="")
+        output.write(
+            f"{current_state}#{current_stack_symbol}|".encode(OUTPUT_ENCODING)
+        )
 
         for symbol in string:
             while (
@@ -78,7 +212,10 @@ def simulate_pushdown_automaton(
                     (current_state, "$", current_stack_symbol)
                 ]
                 stack.push(stack_string)
-                print(f"{current_state}#{stack}|", end="")
+                write_step(output, current_state, stack)
+                if stats is not None:
+                    stats.count("epsilon_steps")
+                    stats.record_max("stack_depth", len(stack))
                 current_stack_symbol = (
                     stack.pop_left() if not stack.is_empty() else None
                 )
@@ -93,7 +230,10 @@ def simulate_pushdown_automaton(
             ):
                 current_state, stack_string = transition
                 stack.push(stack_string)
-                print(f"{current_state}#{stack}|", end="")
+                write_step(output, current_state, stack)
+                if stats is not None:
+                    stats.count("input_steps")
+                    stats.record_max("stack_depth", len(stack))
                 current_stack_symbol = (
                     stack.pop_left() if not stack.is_empty() else None
                 )
@@ -103,7 +243,7 @@ def simulate_pushdown_automaton(
                 fail = True
 
             if fail:
-                print("fail|0")
+                output.write(b"fail|0\n")
                 break
 
         if not fail:
@@ -115,34 +255,724 @@ def simulate_pushdown_automaton(
                     (current_state, "$", current_stack_symbol)
                 ]
                 stack.push(stack_string)
-                print(f"{current_state}#{stack}|", end="")
+                write_step(output, current_state, stack)
+                if stats is not None:
+                    stats.count("epsilon_steps")
+                    stats.record_max("stack_depth", len(stack))
+                current_stack_symbol = (
+                    stack.pop_left() if not stack.is_empty() else None
+                )
+                if current_stack_symbol is None:
+                    break
+            output.write(b"1\n" if current_state in acceptable_states else b"0\n")
+
+
+def compile_epsilon_chain(transitions, state, top, stop_states=frozenset()):
+    """Follow the epsilon transitions from `state` with `top` popped off the stack.
+
+    The chain only works on the symbols it pushes itself and ends when no
+    epsilon transition applies, when it reaches one of `stop_states`, when it
+    needs a symbol from the stack below it, or when it is caught in a cycle.
+    Returns `(steps, state, residue, top, cycle)`: the printed steps as
+    `(state, pushed stack)` pairs, the state the chain ends in, the pushed
+    symbols that are left (top first), the stack symbol on top at the end
+    (`None` if it has to be popped from the stack below) and whether the chain
+    never ends.
+    """
+    pushed = []
+    steps = []
+    # A pair visited again without popping below its earlier height repeats
+    # forever, because the chain is deterministic and never looked further down
+    visit_heights = {}
+    visits_at_height = []
+    while state not in stop_states:
+        transition = transitions.get((state, "$", top))
+        if transition is None:
+            break
+
+        height = len(pushed)
+        while len(visits_at_height) > height + 1:
+            for visit in visits_at_height.pop():
+                del visit_heights[visit]
+        if (state, top) in visit_heights:
+            return tuple(steps), state, "".join(reversed(pushed)), top, True
+        visit_heights[(state, top)] = height
+        visits_at_height.extend([] for _ in range(height + 1 - len(visits_at_height)))
+        visits_at_height[height].append((state, top))
+
+        state, stack_string = transition
+        for symbol in reversed(stack_string):
+            if symbol == "$":
+                break
+            pushed.append(symbol)
+        steps.append((state, "".join(reversed(pushed))))
+        if not pushed:
+            return tuple(steps), state, "", None, False
+        top = pushed.pop()
+    return tuple(steps), state, "".join(reversed(pushed)), top, False
+
+
+def compile_epsilon_chains(transitions, acceptable_states):
+    """Compile the epsilon chain of every (state, stack top) pair.
+
+    Returns two `dict`s: the chains followed before reading an input symbol
+    and the chains followed after the whole string was read, which stop in
+    acceptable states. Each step is stored encoded twice, as the text in
+    front of the stack below the chain and as the whole step for when the
+    stack below is empty.
+    """
+    symbol_chains = {}
+    final_chains = {}
+    for state, input_symbol, top in transitions:
+        if input_symbol != "$":
+            continue
+        symbol_chains[(state, top)] = encode_epsilon_chain(
+            *compile_epsilon_chain(transitions, state, top)
+        )
+        if state not in acceptable_states:
+            final_chains[(state, top)] = encode_epsilon_chain(
+                *compile_epsilon_chain(transitions, state, top, acceptable_states)
+            )
+    return symbol_chains, final_chains
+
+
+def encode_epsilon_chain(steps, state, residue, top, cycle):
+    """Encode the trace steps of a compiled chain for `replay_epsilon_chains`."""
+    encoded_steps = tuple(
+        (
+            f"{step_state}#{pushed}".encode(OUTPUT_ENCODING),
+            f"{step_state}#{pushed or '$'}|".encode(OUTPUT_ENCODING),
+        )
+        for step_state, pushed in steps
+    )
+    return encoded_steps, state, residue, top, cycle
+
+
+def replay_epsilon_chains(chains, state, top, stack, output):
+    """Replay compiled chains from `state` and `top` until none applies.
+
+    Chains that need a symbol from `stack` pop it and continue with the next
+    chain. Returns `(state, top, cycle)`, where `top` is `None` if the stack
+    ran out.
+    """
+    while (chain := chains.get((state, top))) is not None:
+        steps, state, residue, top, cycle = chain
+        if STATS is not None:
+            STATS.count("epsilon_chain_replays")
+            STATS.count("epsilon_steps", len(steps))
+        if stack.is_empty():
+            for _, step in steps:
+                output.write(step)
+        else:
+            below = stack.render()
+            for step_head, _ in steps:
+                output.write(step_head)
+                output.write(below)
+                output.write(b"|")
+        stack.push(residue)
+        if cycle:
+            return state, top, True
+        if top is None:
+            if stack.is_empty():
+                return state, None, False
+            top = stack.pop_left()
+    return state, top, False
+
+
+def simulate_compiled_pushdown_automaton(
+    input_strings,
+    all_states,
+    symbols,
+    stack_symbols,
+    acceptable_states,
+    starting_state,
+    starting_stack,
+    transitions,
+    output=sys.stdout.buffer,
+    chains=None,
+):
+    """Simulate the pushdown automaton on precompiled epsilon chains.
+
+    Writes the same trace as `simulate_pushdown_automaton`, but follows each
+    epsilon chain with a single lookup. A chain that never ends rejects the
+    string: before an input symbol it fails, after the last one the trace up
+    to the repeated configuration is followed by 0. `chains` can hold the
+    result of `compile_epsilon_chains` if it was already computed.
+    """
+    acceptable_states = set(acceptable_states)
+    if chains is None:
+        with timed_phase(STATS, "compile"):
+            chains = compile_epsilon_chains(transitions, acceptable_states)
+    symbol_chains, final_chains = chains
+
+    stats = STATS
+
+    for string in input_strings:
+        stack = PushdownStack()
+        current_state = starting_state
+        current_stack_symbol = starting_stack
+        fail = False
+        output.write(
+            f"{current_state}#{current_stack_symbol}|".encode(OUTPUT_ENCODING)
+        )
+
+        for symbol in string:
+            current_state, current_stack_symbol, cycle = replay_epsilon_chains(
+                symbol_chains, current_state, current_stack_symbol, stack, output
+            )
+            if cycle or current_stack_symbol is None:
+                fail = True
+            elif transition := transitions.get(
+                (current_state, symbol, current_stack_symbol)
+            ):
+                current_state, stack_string = transition
+                stack.push(stack_string)
+                write_step(output, current_state, stack)
+                if stats is not None:
+                    stats.count("input_steps")
+                    stats.record_max("stack_depth", len(stack))
                 current_stack_symbol = (
                     stack.pop_left() if not stack.is_empty() else None
                 )
                 if current_stack_symbol is None:
+                    fail = True
+            else:
+                fail = True
+
+            if fail:
+                output.write(b"fail|0\n")
+                break
+
+        if not fail:
+            current_state, _, cycle = replay_epsilon_chains(
+                final_chains, current_state, current_stack_symbol, stack, output
+            )
+            accepted = not cycle and current_state in acceptable_states
+            output.write(b"1\n" if accepted else b"0\n")
+
+
+def intern_pushdown_automaton(
+    all_states,
+    stack_symbols,
+    acceptable_states,
+    starting_state,
+    starting_stack,
+    transitions,
+):
+    """Translate the automaton to integers for `accept_pushdown_automaton`.
+
+    States and stack symbols become dense ids, and a state with a stack top
+    becomes the configuration `state * len(stack_ids) + top`. Returns
+    `(input_ids, moves, symbol_chains, final_chains, stack_count, accepting,
+    start)`, where `moves[input_id]` maps a configuration to the next state and
+    the pushed stack ids (bottom first) and the chains map a configuration to
+    `(state, residue, top, cycle, step_count)` with a `top` of -1 if the stack
+    has to be popped.
+    """
+    state_ids = {}
+    stack_ids = {}
+    input_ids = {}
+    for state in [*all_states, starting_state]:
+        state_ids.setdefault(state, len(state_ids))
+    for symbol in [*stack_symbols, starting_stack]:
+        stack_ids.setdefault(symbol, len(stack_ids))
+    for (state, input_symbol, top), (new_state, stack_string) in transitions.items():
+        state_ids.setdefault(state, len(state_ids))
+        state_ids.setdefault(new_state, len(state_ids))
+        input_ids.setdefault(input_symbol, len(input_ids))
+        for symbol in [top, *stack_string]:
+            stack_ids.setdefault(symbol, len(stack_ids))
+    stack_count = len(stack_ids)
+
+    def push_ids(stack_string):
+        return tuple(stack_ids[symbol] for symbol in reversed(stack_string))
+
+    moves = [{} for _ in input_ids]
+    for (state, input_symbol, top), (new_state, stack_string) in transitions.items():
+        configuration = state_ids[state] * stack_count + stack_ids[top]
+        moves[input_ids[input_symbol]][configuration] = (
+            state_ids[new_state],
+            push_ids(stack_string[stack_string.rfind("$") + 1 :]),
+        )
+
+    acceptable_states = set(acceptable_states)
+    chains = ({}, {})
+    for phase_chains, stop_states in zip(chains, (frozenset(), acceptable_states)):
+        for state, input_symbol, top in transitions:
+            if input_symbol != "$" or state in stop_states:
+                continue
+            steps, end_state, residue, end_top, cycle = compile_epsilon_chain(
+                transitions, state, top, stop_states
+            )
+            phase_chains[state_ids[state] * stack_count + stack_ids[top]] = (
+                state_ids[end_state],
+                push_ids(residue),
+                -1 if end_top is None else stack_ids[end_top],
+                cycle,
+                len(steps),
+            )
+
+    accepting = bytearray(len(state_ids))
+    for state in acceptable_states:
+        if state in state_ids:
+            accepting[state_ids[state]] = 1
+    start = state_ids[starting_state] * stack_count + stack_ids[starting_stack]
+    return input_ids, moves, *chains, stack_count, bytes(accepting), start
+
+
+def accept_pushdown_automaton(
+    input_strings,
+    all_states,
+    symbols,
+    stack_symbols,
+    acceptable_states,
+    starting_state,
+    starting_stack,
+    transitions,
+    output=sys.stdout.buffer,
+    trace_every=0,
+    trace_output=None,
+    interned=None,
+):
+    """Write only whether each input string is accepted, as 1 or 0.
+
+    Runs on the interned automaton and the compiled epsilon chains, so strings
+    whose epsilon transitions loop forever are rejected. If `trace_every` is
+    set, the full trace of every `trace_every`-th string, starting with the
+    first one, is also written to the binary `trace_output`. `interned` can
+    hold the result of `intern_pushdown_automaton` if it was already computed.
+    """
+    if interned is None:
+        with timed_phase(STATS, "compile"):
+            interned = intern_pushdown_automaton(
+                all_states,
+                stack_symbols,
+                acceptable_states,
+                starting_state,
+                starting_stack,
+                transitions,
+            )
+    (
+        input_ids,
+        moves,
+        symbol_chains,
+        final_chains,
+        stack_count,
+        accepting,
+        start,
+    ) = interned
+    automaton = (
+        all_states,
+        symbols,
+        stack_symbols,
+        acceptable_states,
+        starting_state,
+        starting_stack,
+        transitions,
+    )
+    stats = STATS
+
+    for index, string in enumerate(input_strings):
+        if trace_every and index % trace_every == 0:
+            string = list(string)
+            simulate_compiled_pushdown_automaton([string], *automaton, trace_output)
+
+        stack = []
+        configuration = start
+        accepted = True
+        for symbol in string:
+            while (chain := symbol_chains.get(configuration)) is not None:
+                state, residue, top, cycle, step_count = chain
+                if stats is not None:
+                    stats.count("epsilon_chain_replays")
+                    stats.count("epsilon_steps", step_count)
+                stack.extend(residue)
+                if cycle:
                     break
-            print(1 if current_state in acceptable_states else 0)
+                if top < 0:
+                    if not stack:
+                        break
+                    top = stack.pop()
+                configuration = state * stack_count + top
+            if chain is not None:
+                accepted = False
+                break
+
+            input_id = input_ids.get(symbol)
+            move = None if input_id is None else moves[input_id].get(configuration)
+            if move is None:
+                accepted = False
+                break
+            state, pushed = move
+            stack.extend(pushed)
+            if stats is not None:
+                stats.count("input_steps")
+                stats.record_max("stack_depth", len(stack))
+            if not stack:
+                accepted = False
+                break
+            configuration = state * stack_count + stack.pop()
+
+        if accepted:
+            state = configuration // stack_count
+            cycle = False
+            while (chain := final_chains.get(configuration)) is not None:
+                state, residue, top, cycle, step_count = chain
+                if stats is not None:
+                    stats.count("epsilon_chain_replays")
+                    stats.count("epsilon_steps", step_count)
+                if cycle:
+                    break
+                stack.extend(residue)
+                if top < 0:
+                    if not stack:
+                        break
+                    top = stack.pop()
+                configuration = state * stack_count + top
+            accepted = not cycle and accepting[state]
+        output.write(b"1\n" if accepted else b"0\n")
+
+
+def accept_nondeterministic_pushdown_automaton(
+    input_strings,
+    all_states,
+    symbols,
+    stack_symbols,
+    acceptable_states,
+    starting_state,
+    starting_stack,
+    transitions,
+    output=sys.stdout.buffer,
+):
+    """Write whether a nondeterministic automaton accepts each string, as 1 or 0.
+
+    `transitions` maps each key to a `list` of targets, and epsilon transitions
+    may or may not be taken. All branches share one graph-structured stack: a
+    vertex `(symbol, position, transition, index)` stands for the `index`-th
+    symbol pushed by `transition` at input `position`, and its predecessors
+    are the vertices that can lie below it (`None` for the bottom of the
+    stack). Branches in the same state on the same vertex are merged, so the
+    work per position is polynomial in the size of the automaton. As in
+    `simulate_pushdown_automaton`, a branch whose input transition empties the
+    stack fails. A branch whose epsilon transition empties it cannot move
+    anymore; it only accepts if that happens after the last input symbol.
+    """
+    acceptable_states = set(acceptable_states)
+    pushed_symbols = {
+        target: target[1][target[1].rfind("$") + 1 :]
+        for targets in transitions.values()
+        for target in targets
+    }
+
+    for string in input_strings:
+        root = (starting_stack, 0, None, 0)
+        predecessors = {root: {None}}
+        configurations = {(starting_state, root)}
+        position = 0
+
+        def add_configuration(state, vertex):
+            if (state, vertex) not in configurations:
+                configurations.add((state, vertex))
+                worklist.append((state, vertex))
+
+        def add_predecessor(vertex, below):
+            if below not in predecessors[vertex]:
+                predecessors[vertex].add(below)
+                for continuation in pops.get(vertex, ()):
+                    continuation(below)
+
+        def apply_transition(vertex, target, epsilon):
+            # Pop `vertex` and push the symbols of `target` on everything below
+            # it, including what later turns out to be below it
+            new_state, _ = target
+            pushed = pushed_symbols[target]
+            if not pushed:
+
+                def continuation(below):
+                    # Only an epsilon transition may leave the stack empty
+                    if below is not None or epsilon:
+                        add_configuration(new_state, below)
+
+            else:
+                vertices = [
+                    (symbol, position, target, index)
+                    for index, symbol in enumerate(pushed)
+                ]
+                if vertices[0] not in predecessors:
+                    for upper, lower in zip(vertices, vertices[1:]):
+                        predecessors[upper] = {lower}
+                    predecessors[vertices[-1]] = set()
+                add_configuration(new_state, vertices[0])
+
+                def continuation(below):
+                    add_predecessor(vertices[-1], below)
+
+            pops.setdefault(vertex, []).append(continuation)
+            for below in list(predecessors[vertex]):
+                continuation(below)
+
+        def close_configurations():
+            # Follow epsilon transitions from every configuration at `position`
+            while worklist:
+                state, vertex = worklist.pop()
+                if vertex is None:
+                    continue
+                for target in transitions.get((state, "$", vertex[0]), ()):
+                    apply_transition(vertex, target, True)
+
+        worklist = list(configurations)
+        pops = {}
+        close_configurations()
+        for symbol in string:
+            current_configurations = configurations
+            configurations = set()
+            worklist = []
+            pops = {}
+            position += 1
+            for state, vertex in current_configurations:
+                if vertex is None:
+                    continue
+                for target in transitions.get((state, symbol, vertex[0]), ()):
+                    apply_transition(vertex, target, False)
+            close_configurations()
+
+        accepted = any(state in acceptable_states for state, _ in configurations)
+        if STATS is not None:
+            STATS.count("gss_vertices", len(predecessors))
+        output.write(b"1\n" if accepted else b"0\n")
+
+
+def init_worker(automaton, simulate):
+    """Store the automaton definition shared by all tasks of a worker process."""
+    global WORKER_AUTOMATON, WORKER_SIMULATE
+    WORKER_AUTOMATON = automaton
+    WORKER_SIMULATE = simulate
+
+
+def simulate_chunk(input_strings):
+    """Return the encoded trace of a chunk of input strings."""
+    output = io.BytesIO()
+    WORKER_SIMULATE(input_strings, *WORKER_AUTOMATON, output)
+    return output.getvalue()
+
+
+def simulate_in_parallel(
+    input_strings, automaton, jobs, output, simulate=simulate_pushdown_automaton
+):
+    """Simulate input strings on `jobs` worker processes, keeping input order.
+
+    `automaton` holds the remaining arguments of `simulate` and is sent to each
+    worker once, when the worker starts.
+    """
+    chunk_size = max(1, len(input_strings) // (jobs * 4))
+    chunks = [
+        input_strings[start : start + chunk_size]
+        for start in range(0, len(input_strings), chunk_size)
+    ]
+    with multiprocessing.Pool(
+        jobs, initializer=init_worker, initargs=(automaton, simulate)
+    ) as pool:
+        for chunk_output in pool.imap(simulate_chunk, chunks):
+            output.write(chunk_output)
+
+
+def select_simulation(nondeterministic, accept_only=False, compiled=False):
+    """Return the simulation function for the given mode flags."""
+    if nondeterministic:
+        return accept_nondeterministic_pushdown_automaton
+    if accept_only:
+        return accept_pushdown_automaton
+    if compiled:
+        return simulate_compiled_pushdown_automaton
+    return simulate_pushdown_automaton
+
+
+def compile_served_automaton(definition_lines, nondeterministic, accept_only, compiled):
+    """Parse an automaton for `--serve` and precompute what its simulation
+    function would compute on every call.
+    """
+    automaton, nondeterministic = parse_automaton(definition_lines, nondeterministic)
+    simulate = select_simulation(nondeterministic, accept_only, compiled)
+    (
+        all_states,
+        _,
+        stack_symbols,
+        acceptable_states,
+        starting_state,
+        starting_stack,
+        transitions,
+    ) = automaton
+    if simulate is accept_pushdown_automaton:
+        simulate = partial(
+            simulate,
+            interned=intern_pushdown_automaton(
+                all_states,
+                stack_symbols,
+                acceptable_states,
+                starting_state,
+                starting_stack,
+                transitions,
+            ),
+        )
+    elif simulate is simulate_compiled_pushdown_automaton:
+        simulate = partial(
+            simulate,
+            chains=compile_epsilon_chains(transitions, set(acceptable_states)),
+        )
+    return automaton, simulate
+
+
+def answer_served_strings(served_automaton, query_lines):
+    """Return the encoded output for the input strings of one `--serve` request."""
+    automaton, simulate = served_automaton
+    output = io.BytesIO()
+    simulate(parse_input_data(query_lines[0]), *automaton, output)
+    return output.getvalue()
 
 
 if __name__ == "__main__":
-    input_lines = [line.strip() for line in stdin.readlines()]
-
-    INPUT_STRINGS = parse_input_data(input_lines[0])
-    ALL_STATES = input_lines[1].split(",")
-    SYMBOLS = input_lines[2].split(",")
-    STACK_SYMBOLS = input_lines[3].split(",")
-    ACCEPTABLE_STATES = input_lines[4].split(",")
-    STARTING_STATE = input_lines[5]
-    STARTING_STACK = input_lines[6]
-    TRANSITIONS = get_transitions(input_lines[7:])
-
-    simulate_pushdown_automaton(
-        INPUT_STRINGS,
-        ALL_STATES,
-        SYMBOLS,
-        STACK_SYMBOLS,
-        ACCEPTABLE_STATES,
-        STARTING_STATE,
-        STARTING_STACK,
-        TRANSITIONS,
+    argument_parser = argparse.ArgumentParser(
+        description="Simulate a deterministic pushdown automaton read from standard "
+        "input."
+    )
+    argument_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="read the input strings incrementally and write the trace through "
+        "one buffered writer, keeping memory flat for very long input lines",
+    )
+    argument_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes that simulate input strings",
+    )
+    argument_parser.add_argument(
+        "--compiled",
+        action="store_true",
+        help="precompile the epsilon chain of every (state, stack top) pair and "
+        "reject strings whose epsilon transitions loop forever",
+    )
+    argument_parser.add_argument(
+        "--accept-only",
+        action="store_true",
+        help="print only 1 (accepted) or 0 (rejected) for each input string, "
+        "without the trace",
     )
+    argument_parser.add_argument(
+        "--trace-every",
+        type=int,
+        default=0,
+        metavar="N",
+        help="with --accept-only, also write the trace of every N-th input "
+        "string to standard error",
+    )
+    argument_parser.add_argument(
+        "--nondeterministic",
+        action="store_true",
+        help="allow several transitions per (state, input, stack top) key and "
+        "optional epsilon transitions; unless the automaton is deterministic, "
+        "print only 1 or 0 for each input string",
+    )
+    argument_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="write counters and per-phase wall times as JSON to standard error",
+    )
+    argument_parser.add_argument(
+        "--serve",
+        metavar="SOCKET",
+        help="instead of reading standard input, answer requests sent to the Unix "
+        "socket SOCKET, keeping compiled automata in memory between requests",
+    )
+    argument_parser.add_argument(
+        "--served-automata",
+        type=int,
+        default=DEFAULT_SERVED_AUTOMATA,
+        help="maximum number of compiled automata kept by --serve",
+    )
+    arguments = argument_parser.parse_args()
+    if arguments.trace_every < 0:
+        argument_parser.error("--trace-every cannot be negative")
+    if arguments.trace_every and not arguments.accept_only:
+        argument_parser.error("--trace-every requires --accept-only")
+    if arguments.trace_every and arguments.jobs > 1:
+        argument_parser.error("--trace-every cannot be combined with --jobs")
+    if arguments.jobs < 1:
+        argument_parser.error("--jobs must be at least 1")
+    if arguments.jobs > 1 and arguments.stream:
+        argument_parser.error("--jobs cannot be combined with --stream")
+    if arguments.jobs > 1 and arguments.stats:
+        argument_parser.error("--stats cannot be combined with --jobs")
+    if arguments.serve and (
+        arguments.stream
+        or arguments.jobs > 1
+        or arguments.trace_every
+        or arguments.stats
+    ):
+        argument_parser.error(
+            "--serve cannot be combined with --stream, --jobs, --trace-every or --stats"
+        )
+    if arguments.served_automata < 1:
+        argument_parser.error("--served-automata must be at least 1")
+    if arguments.stats:
+        STATS = Stats("SimPa")
+
+    if arguments.serve:
+        # asyncio costs about 10 MiB and 20 ms at startup, so only --serve
+        # imports the server
+        from common.server import serve
+
+        # Every request holds one line of input strings followed by the automaton
+        serve(
+            arguments.serve,
+            1,
+            partial(
+                compile_served_automaton,
+                nondeterministic=arguments.nondeterministic,
+                accept_only=arguments.accept_only,
+                compiled=arguments.compiled,
+            ),
+            answer_served_strings,
+            arguments.served_automata,
+        )
+        sys.exit()
+
+    with timed_phase(STATS, "parse"):
+        if arguments.stream:
+            read_input_line = detach_first_line(stdin)
+            input_lines = [""] + read_lines(stdin)
+            INPUT_STRINGS = iter_input_sequences(read_input_line())
+        else:
+            input_lines = read_lines(stdin)
+            INPUT_STRINGS = parse_input_data(input_lines[0])
+        AUTOMATON, NONDETERMINISTIC = parse_automaton(
+            input_lines[1:], arguments.nondeterministic
+        )
+    OUTPUT = (
+        open_binary_output()
+        if arguments.stream or arguments.jobs > 1
+        else sys.stdout.buffer
+    )
+
+    if arguments.trace_every and not NONDETERMINISTIC:
+        SIMULATE = partial(
+            accept_pushdown_automaton,
+            trace_every=arguments.trace_every,
+            trace_output=sys.stderr.buffer,
+        )
+    else:
+        SIMULATE = select_simulation(
+            NONDETERMINISTIC, arguments.accept_only, arguments.compiled
+        )
+
+    if arguments.jobs > 1:
+        simulate_in_parallel(INPUT_STRINGS, AUTOMATON, arguments.jobs, OUTPUT, SIMULATE)
+    else:
+        # The trace is written while simulating, so "output" is the final flush
+        with timed_phase(STATS, "simulate"):
+            SIMULATE(INPUT_STRINGS, *AUTOMATON, OUTPUT)
+    with timed_phase(STATS, "output"):
+        OUTPUT.flush()
+    if STATS is not None:
+        STATS.report()
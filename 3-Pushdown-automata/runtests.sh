@@ -1,17 +1,67 @@
 #!/bin/bash
 
-num_tests=$(ls -l testovi | grep -c ^d)
+num_tests=$(ls -d testovi/test*/ | wc -l)
 
 for i in $(seq 1 $num_tests)  # iterate over the number of test cases
 do
     dir=$(printf "%02d\n" $i)
     echo "Test $dir"
 
-    res=$(python SimPa.py < "testovi/test$dir/primjer.in" | diff "testovi/test$dir/primjer.out" -)
+    res=$(python SimPa.py "$@" < "testovi/test$dir/primjer.in" | diff "testovi/test$dir/primjer.out" -)
     if [ "$res" != "" ]
     then
         echo "FAIL $res"
     else
         echo "OK"
     fi
-done
\ No newline at end of file
+done
+
+# Nondeterministic automata, run with --nondeterministic
+num_tests=$(ls -d testovi/nondeterministic/test*/ | wc -l)
+
+for i in $(seq 1 $num_tests)
+do
+    dir=$(printf "%02d\n" $i)
+    echo "Nondeterministic test $dir"
+
+    res=$(python SimPa.py --nondeterministic "$@" < "testovi/nondeterministic/test$dir/primjer.in" | diff "testovi/nondeterministic/test$dir/primjer.out" -)
+    if [ "$res" != "" ]
+    then
+        echo "FAIL $res"
+    else
+        echo "OK"
+    fi
+done
+
+# Automata with epsilon cycles, which only --compiled detects instead of
+# running forever
+num_tests=$(ls -d testovi/compiled/test*/ | wc -l)
+
+for i in $(seq 1 $num_tests)
+do
+    dir=$(printf "%02d\n" $i)
+    echo "Compiled test $dir"
+
+    res=$(python SimPa.py --compiled "$@" < "testovi/compiled/test$dir/primjer.in" | diff "testovi/compiled/test$dir/primjer.out" -)
+    if [ "$res" != "" ]
+    then
+        echo "FAIL $res"
+    else
+        echo "OK"
+    fi
+done
+
+# --accept-only prints just the verdicts of the deterministic tests, including
+# the ones with epsilon cycles
+for dir in testovi/test* testovi/compiled/test*
+do
+    echo "Accept-only test ${dir#testovi/}"
+
+    res=$(python SimPa.py --accept-only "$@" < "$dir/primjer.in" | diff "$dir/primjer.acc" -)
+    if [ "$res" != "" ]
+    then
+        echo "FAIL $res"
+    else
+        echo "OK"
+    fi
+done
@@ -1,5 +1,44 @@
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+from contextlib import redirect_stdout
+from functools import partial
+from itertools import repeat
 from sys import stdin
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.stats import Stats, timed_phase
+from common.streaming import CHUNK_SIZE, open_output
+
+# Lookahead for the end of the input and for any character other than a, b, c
+END = "$"
+OTHER = "?"
+TERMINALS = ("a", "b", "c", OTHER, END)
+CLASSES = {"a": "a", "b": "b", "c": "c", None: END}
+OUTPUT_CHUNK = 1 << 12
+# Instrumentation of the run, set only with --stats
+STATS = None
+
+# The language of the recursive parser. B1, B2 and B3 split up the body of B
+# so that B can end early at the end of the input; they are not printed.
+GRAMMAR = {
+    "S": [["a", "A", "B"], ["b", "B", "A"]],
+    "A": [["b", "C"], ["a"]],
+    "B": [["c", "B1"], []],
+    "B1": [["c", "S", "B2"], []],
+    "B2": [["b", "B3"], []],
+    "B3": [["c"], []],
+    "C": [["A", "A"]],
+}
+VISIBLE = {"S", "A", "B", "C"}
+# The recursive parser does not look ahead everywhere FOLLOW would: B and C
+# expand on any lookahead, while B1, B2 and B3 only end early at the end of
+# the input and fail on anything else.
+DEFAULTS = {"B": [], "C": ["A", "A"]}
+END_ONLY = {"B1", "B2", "B3"}
+
 
 def produkcija_s():
     global INDEX
@@ -59,8 +98,271 @@ def produkcija_c():
     return produkcija_a() and produkcija_a()
 
 
+def first_of_sequence(sequence, first):
+    result = set()
+    for symbol in sequence:
+        if symbol not in GRAMMAR:
+            result.add(symbol)
+            return result
+        result |= first[symbol] - {""}
+        if "" not in first[symbol]:
+            return result
+    result.add("")
+    return result
+
+
+def compute_first():
+    first = {nonterminal: set() for nonterminal in GRAMMAR}
+    changed = True
+    while changed:
+        changed = False
+        for nonterminal, alternatives in GRAMMAR.items():
+            for alternative in alternatives:
+                added = first_of_sequence(alternative, first) - first[nonterminal]
+                if added:
+                    first[nonterminal] |= added
+                    changed = True
+    return first
+
+
+def compute_follow(first):
+    follow = {nonterminal: set() for nonterminal in GRAMMAR}
+    follow["S"].add(END)
+    changed = True
+    while changed:
+        changed = False
+        for nonterminal, alternatives in GRAMMAR.items():
+            for alternative in alternatives:
+                for index, symbol in enumerate(alternative):
+                    if symbol not in GRAMMAR:
+                        continue
+                    added = first_of_sequence(alternative[index + 1 :], first)
+                    if "" in added:
+                        added = (added - {""}) | follow[nonterminal]
+                    if not added <= follow[symbol]:
+                        follow[symbol] |= added
+                        changed = True
+    return follow
+
+
+def build_table():
+    # LL(1) table {(nonterminal, lookahead): alternative}; epsilon alternatives
+    # get the FOLLOW set, limited to the end of the input in END_ONLY
+    first = compute_first()
+    follow = compute_follow(first)
+    table = {}
+    for nonterminal, alternatives in GRAMMAR.items():
+        for alternative in alternatives:
+            lookaheads = first_of_sequence(alternative, first)
+            if "" in lookaheads:
+                lookaheads = (lookaheads - {""}) | (
+                    follow[nonterminal] & {END}
+                    if nonterminal in END_ONLY
+                    else follow[nonterminal]
+                )
+            for lookahead in lookaheads:
+                if table.get((nonterminal, lookahead), alternative) != alternative:
+                    raise ValueError(
+                        f"Grammar is not LL(1): {nonterminal}, {lookahead}"
+                    )
+                table[(nonterminal, lookahead)] = alternative
+        if nonterminal in DEFAULTS:
+            for lookahead in TERMINALS:
+                table.setdefault((nonterminal, lookahead), DEFAULTS[nonterminal])
+    return table
+
+
+def read_symbols(source, chunk_size=CHUNK_SIZE):
+    # Characters of source.readline().strip(), read in chunks. Whitespace at the
+    # end of a chunk is only counted until a later character shows it is not
+    # trailing, and then comes out as OTHER, which is all parse needs.
+    spaces = 0
+    at_start = True
+    while True:
+        chunk = source.readline(chunk_size)
+        line_end = not chunk or chunk.endswith("\n")
+        if at_start:
+            chunk = chunk.lstrip()
+            at_start = not chunk
+
+        content = chunk.rstrip()
+        if content:
+            yield from repeat(OTHER, spaces)
+            yield from content
+            spaces = 0
+        if line_end:
+            return
+        spaces += len(chunk) - len(content)
+
+
+def parse(characters, output):
+    # Parse the characters with an explicit stack, writing the trace to output
+    # in batches of up to OUTPUT_CHUNK symbols. Every printed symbol is one
+    # call of a production function in the recursive parser.
+    stats = STATS
+    remaining = iter(characters)
+    stack = ["S"]
+    trace = []
+    lookahead = CLASSES.get(next(remaining, None), OTHER)
+    try:
+        while stack:
+            symbol = stack.pop()
+            if symbol == lookahead:
+                lookahead = CLASSES.get(next(remaining, None), OTHER)
+                continue
+            expansion = EXPANSIONS.get((symbol, lookahead))
+            if expansion is None:
+                if symbol in VISIBLE:
+                    trace.append(symbol)
+                return False
+            printed, right_side = expansion
+            if printed:
+                trace.append(printed)
+                if len(trace) >= OUTPUT_CHUNK:
+                    output.write("".join(trace))
+                    if stats is not None:
+                        stats.count("production_calls", len(trace))
+                    trace.clear()
+            stack.extend(right_side)
+            if stats is not None:
+                stats.record_max("stack_depth", len(stack))
+        return lookahead == END
+    finally:
+        output.write("".join(trace))
+        if stats is not None:
+            stats.count("production_calls", len(trace))
+
+
+def parse_line(line, engine="table"):
+    # Trace and verdict of one stripped input line, as the single line mode
+    # prints them; the recursive engine starts from a fresh INDEX and INPUT_DATA
+    global INDEX, INPUT_DATA
+    output = io.StringIO()
+    if engine == "recursive":
+        INPUT_DATA = line
+        INDEX = 0
+        with redirect_stdout(output):
+            accept = "\nDA" if produkcija_s() and INDEX == len(INPUT_DATA) else "\nNE"
+            print(accept)
+    else:
+        output.write("\nDA\n" if parse(line, output) else "\nNE\n")
+    return output.getvalue()
+
+
+def parse_lines(lines, engine, jobs, output):
+    # Parse every line, on `jobs` worker processes if more than one,
+    # writing the results in input order
+    lines = (line.strip() for line in lines)
+    if jobs == 1:
+        for line in lines:
+            output.write(parse_line(line, engine))
+        return
+    with multiprocessing.Pool(jobs) as pool:
+        for result in pool.imap(partial(parse_line, engine=engine), lines, 64):
+            output.write(result)
+
+
+TABLE = build_table()
+# The printed name and the reversed right side for every table entry
+EXPANSIONS = {
+    key: (key[0] if key[0] in VISIBLE else "", alternative[::-1])
+    for key, alternative in TABLE.items()
+}
+
+
 if __name__ == '__main__':
-    INPUT_DATA = stdin.readline().strip()
-    INDEX = 0
-    accept = "\nDA" if produkcija_s() and INDEX == len(INPUT_DATA) else "\nNE"
-    print(accept)
+    argument_parser = argparse.ArgumentParser(
+        description="Parse a line from standard input and print the production trace."
+    )
+    argument_parser.add_argument(
+        "--engine",
+        choices=("table", "recursive"),
+        default="table",
+        help="parse with the LL(1) table and an explicit stack, or with the "
+        "original recursive descent functions",
+    )
+    argument_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="read the input in chunks while parsing, keeping memory bounded by "
+        "the nesting depth instead of the input length",
+    )
+    argument_parser.add_argument(
+        "--batch",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="parse every line of FILE (standard input if omitted) in one "
+        "process, printing the trace and verdict of each line in order",
+    )
+    argument_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="with --batch, number of worker processes that parse lines",
+    )
+    argument_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="write counters and per-phase wall times as JSON to standard error",
+    )
+    arguments = argument_parser.parse_args()
+    if arguments.stream and arguments.engine == "recursive":
+        argument_parser.error("--stream requires the table engine")
+    if arguments.stream and arguments.batch:
+        argument_parser.error("--stream cannot be combined with --batch")
+    if arguments.jobs < 1:
+        argument_parser.error("--jobs must be at least 1")
+    if arguments.jobs > 1 and not arguments.batch:
+        argument_parser.error("--jobs requires --batch")
+    if arguments.jobs > 1 and arguments.stats:
+        argument_parser.error("--stats cannot be combined with --jobs")
+
+    if arguments.stats:
+        STATS = Stats("Parser")
+        # The production functions call each other by their global names, so
+        # the counting wrappers only cost anything when --stats is given
+        produkcija_s = STATS.track_calls(
+            produkcija_s, "production_calls", "recursion_depth"
+        )
+        produkcija_a = STATS.track_calls(
+            produkcija_a, "production_calls", "recursion_depth"
+        )
+        produkcija_b = STATS.track_calls(
+            produkcija_b, "production_calls", "recursion_depth"
+        )
+        produkcija_c = STATS.track_calls(
+            produkcija_c, "production_calls", "recursion_depth"
+        )
+
+    # Lines are read while parsing in --batch and --stream, so their reading
+    # counts as "simulate" there
+    if arguments.batch:
+        OUTPUT = open_output()
+        with timed_phase(STATS, "simulate"):
+            if arguments.batch == "-":
+                parse_lines(stdin, arguments.engine, arguments.jobs, OUTPUT)
+            else:
+                with open(arguments.batch) as INPUT_FILE:
+                    parse_lines(INPUT_FILE, arguments.engine, arguments.jobs, OUTPUT)
+    elif arguments.engine == "recursive":
+        with timed_phase(STATS, "parse"):
+            INPUT_DATA = stdin.readline().strip()
+        INDEX = 0
+        OUTPUT = sys.stdout
+        with timed_phase(STATS, "simulate"):
+            accept = "\nDA" if produkcija_s() and INDEX == len(INPUT_DATA) else "\nNE"
+            print(accept)
+    else:
+        with timed_phase(STATS, "parse"):
+            if arguments.stream:
+                INPUT_DATA = read_symbols(stdin)
+            else:
+                INPUT_DATA = stdin.readline().strip()
+        OUTPUT = open_output()
+        with timed_phase(STATS, "simulate"):
+            OUTPUT.write("\nDA\n" if parse(INPUT_DATA, OUTPUT) else "\nNE\n")
+    with timed_phase(STATS, "output"):
+        OUTPUT.flush()
+    if STATS is not None:
+        STATS.report()
@@ -0,0 +1,32 @@
+#!/bin/bash
+
+num_tests=$(ls -d test/test*/ | wc -l)
+
+for i in $(seq 1 $num_tests)  # iterate over the number of test cases
+do
+    dir=$(printf "%02d\n" $i)
+    echo "Test $dir"
+
+    res=$(python Parser.py "$@" < "test/test$dir/test.in" | diff "test/test$dir/test.out" -)
+    if [ "$res" != "" ]
+    then
+        echo "FAIL $res"
+    else
+        echo "OK"
+    fi
+done
+
+# --batch: every input line in one process, with the traces and verdicts in
+# the order of the lines
+for engine in table recursive
+do
+    echo "Batch test $engine"
+
+    res=$(cat test/test*/test.in | python Parser.py --batch --engine $engine "$@" | diff <(cat test/test*/test.out) -)
+    if [ "$res" != "" ]
+    then
+        echo "FAIL $res"
+    else
+        echo "OK"
+    fi
+done
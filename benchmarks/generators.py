@@ -0,0 +1,134 @@
+"""Seeded generators of large inputs for the four tools.
+
+Every generator writes one complete standard input to `output` and depends
+only on its arguments, so a scenario always sees the same input.
+"""
+
+import random
+from typing import TextIO
+
+
+def write_enka(
+    output: TextIO,
+    seed: int,
+    state_count: int,
+    symbol_count: int = 4,
+    epsilon_edges: int = 4,
+    sequence_count: int = 200,
+    sequence_length: int = 100,
+) -> None:
+    """An epsilon-NFA for SimEnka with `epsilon_edges` epsilon edges per state.
+
+    Most epsilon edges lead a few states forward, forming long chains; the
+    rest jump anywhere, closing large cycles.
+    """
+    rng = random.Random(seed)
+    states = [f"q{index}" for index in range(state_count)]
+    symbols = [f"s{index}" for index in range(symbol_count)]
+
+    output.write(
+        "|".join(
+            ",".join(rng.choice(symbols) for _ in range(sequence_length))
+            for _ in range(sequence_count)
+        )
+        + "\n"
+    )
+    output.write(",".join(states) + "\n")
+    output.write(",".join(symbols) + "\n")
+    output.write(",".join(rng.sample(states, max(1, state_count // 10))) + "\n")
+    output.write(states[0] + "\n")
+    for index, state in enumerate(states):
+        for symbol in symbols:
+            if rng.random() < 0.3:
+                targets = rng.sample(states, rng.randint(1, 2))
+                output.write(f"{state},{symbol}->{','.join(targets)}\n")
+        targets = set()
+        for _ in range(epsilon_edges):
+            if rng.random() < 0.8:
+                targets.add(states[min(state_count - 1, index + rng.randint(1, 8))])
+            else:
+                targets.add(rng.choice(states))
+        targets.discard(state)
+        if targets:
+            output.write(f"{state},$->{','.join(sorted(targets))}\n")
+
+
+def write_dfa(
+    output: TextIO,
+    seed: int,
+    state_count: int,
+    symbol_count: int = 3,
+    core_count: int | None = None,
+) -> None:
+    """A DFA for MinDKA whose minimal DFA has at most `core_count` states.
+
+    Every state copies a random state of a small core DFA and moves to some
+    copy of the core target, so minimization has many states to merge.
+    """
+    rng = random.Random(seed)
+    if core_count is None:
+        core_count = max(2, state_count // 20)
+    symbols = [chr(ord("a") + index) for index in range(symbol_count)]
+    core_transitions = [
+        [rng.randrange(core_count) for _ in symbols] for _ in range(core_count)
+    ]
+    core_accepting = [rng.random() < 0.5 for _ in range(core_count)]
+
+    core_of = [index % core_count for index in range(state_count)]
+    rng.shuffle(core_of)
+    copies = [[] for _ in range(core_count)]
+    for index, core in enumerate(core_of):
+        copies[core].append(index)
+
+    states = [f"p{index}" for index in range(state_count)]
+    output.write(",".join(states) + "\n")
+    output.write(",".join(symbols) + "\n")
+    output.write(
+        ",".join(state for state, core in zip(states, core_of) if core_accepting[core])
+        + "\n"
+    )
+    output.write(states[0] + "\n")
+    for state, core in zip(states, core_of):
+        for symbol, target_core in zip(symbols, core_transitions[core]):
+            target = states[rng.choice(copies[target_core])]
+            output.write(f"{state},{symbol}->{target}\n")
+
+
+def write_deep_pda(
+    output: TextIO, seed: int, depth: int, string_count: int = 4
+) -> None:
+    """A PDA for SimPa recognizing a^n b^n, run on strings pushing `depth` symbols.
+
+    About half of the strings are in the language; the others have one
+    symbol changed near their end.
+    """
+    rng = random.Random(seed)
+    strings = []
+    for _ in range(string_count):
+        string = ["a"] * depth + ["b"] * depth
+        if rng.random() < 0.5:
+            string[-rng.randint(1, depth)] = "a"
+        strings.append(",".join(string))
+
+    output.write("|".join(strings) + "\n")
+    output.write("q0,q1,q2\n")
+    output.write("a,b\n")
+    output.write("K,A\n")
+    output.write("q2\n")
+    output.write("q0\n")
+    output.write("K\n")
+    output.write("q0,a,K->q0,AK\n")
+    output.write("q0,a,A->q0,AA\n")
+    output.write("q0,b,A->q1,$\n")
+    output.write("q1,b,A->q1,$\n")
+    output.write("q1,$,K->q2,K\n")
+
+
+def write_nested_parser_input(output: TextIO, seed: int, depth: int) -> None:
+    """A line for Parser nesting S `depth` times through B -> ccSbc.
+
+    The seed picks whether the innermost S is `ba` (accepted) or `bb`.
+    """
+    rng = random.Random(seed)
+    innermost = "ba" if rng.random() < 0.5 else "bb"
+    output.write("bcc" * depth + innermost + "bca" * depth + "\n")
@@ -0,0 +1,104 @@
+"""Compare isolated IncrementalDFA edits with a full minimization of the DFA.
+
+The DFA comes from `generators.write_dfa` with one core state per state, so
+it is nearly minimal and every state keeps its own class. Each edit touches
+a fresh state that nothing reaches: an edge from it into the DFA, a copy of
+an existing state's transitions (which has to rejoin that state's class) or
+a change of whether it accepts. Only the states that reach an edited state
+are revisited, so an edit should cost a small fraction of a full run.
+"""
+
+import argparse
+import io
+import os
+import random
+import statistics
+import sys
+import time
+
+import generators
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "2-DFA")
+)
+import MinDKA
+
+
+def time_full_run() -> float:
+    start = time.perf_counter()
+    MinDKA.minimize_dfa()
+    return time.perf_counter() - start
+
+
+def time_edits(edit_count: int, seed: int) -> list[float]:
+    incremental_dfa = MinDKA.IncrementalDFA.from_loaded_dfa()
+    incremental_dfa.minimized()
+    rng = random.Random(seed)
+    timings = []
+    for index in range(edit_count):
+        fresh_state = f"fresh{index}"
+        source_state = rng.choice(MinDKA.ALL_STATES)
+        start = time.perf_counter()
+        if index % 3 == 0:
+            incremental_dfa.add_transition(
+                fresh_state, rng.choice(MinDKA.SYMBOLS), source_state
+            )
+        elif index % 3 == 1:
+            for symbol in MinDKA.SYMBOLS:
+                next_state = MinDKA.TRANSITIONS.get((source_state, symbol))
+                if next_state is not None:
+                    incremental_dfa.add_transition(fresh_state, symbol, next_state)
+            if source_state in incremental_dfa.acceptable_states:
+                incremental_dfa.toggle_accepting(fresh_state)
+        else:
+            incremental_dfa.add_transition(fresh_state, MinDKA.SYMBOLS[0], fresh_state)
+            incremental_dfa.toggle_accepting(fresh_state)
+        incremental_dfa.refresh_partition()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Time isolated IncrementalDFA edits against a full minimization."
+    )
+    argument_parser.add_argument(
+        "--states", type=int, default=50_000, help="number of DFA states"
+    )
+    argument_parser.add_argument(
+        "--edits", type=int, default=30, help="number of timed edits"
+    )
+    argument_parser.add_argument("--seed", type=int, default=5)
+    argument_parser.add_argument(
+        "--min-speedup",
+        type=float,
+        default=10.0,
+        help="fail unless the slowest edit is this many times faster than a "
+        "full minimization",
+    )
+    arguments = argument_parser.parse_args()
+    if arguments.states < 2:
+        argument_parser.error("--states must be at least 2")
+    if arguments.edits < 1:
+        argument_parser.error("--edits must be at least 1")
+
+    DFA_TEXT = io.StringIO()
+    generators.write_dfa(
+        DFA_TEXT, arguments.seed, arguments.states, core_count=arguments.states
+    )
+    MinDKA.parse_dfa_input(DFA_TEXT.getvalue().splitlines())
+
+    FULL_SECONDS = time_full_run()
+    EDIT_SECONDS = time_edits(arguments.edits, arguments.seed)
+    print(
+        f"full minimization {FULL_SECONDS:.4f}s, edit median "
+        f"{statistics.median(EDIT_SECONDS):.6f}s, slowest {max(EDIT_SECONDS):.6f}s",
+        file=sys.stderr,
+    )
+    if max(EDIT_SECONDS) * arguments.min_speedup > FULL_SECONDS:
+        print(
+            f"Regression: an edit took more than 1/{arguments.min_speedup:g} "
+            "of a full minimization",
+            file=sys.stderr,
+        )
+        sys.exit(1)
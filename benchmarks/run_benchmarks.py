@@ -0,0 +1,298 @@
+"""Time the four tools on large generated inputs and compare with a baseline.
+
+Each scenario runs one tool as a child process on a generated input. The
+wall time and the peak memory of the child (from `os.wait4`) are recorded
+together with a hash of its output, so a changed result shows up as well as
+a slowdown. The tool is started by a fresh interpreter that only measures
+it: a child forked from this harness would report the harness's own peak
+RSS in `ru_maxrss` whenever that is larger than the tool's.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from typing import Callable, NamedTuple
+
+import generators
+
+REPOSITORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+
+# Runs the command in argv[2:] and writes its wall time and peak RSS in KiB
+# to the file descriptor in argv[1], exiting with the command's status
+MEASURE_COMMAND = """
+import os, sys, time
+report = int(sys.argv[1])
+start = time.perf_counter()
+pid = os.fork()
+if pid == 0:
+    os.close(report)
+    os.execv(sys.argv[2], sys.argv[2:])
+_, status, usage = os.wait4(pid, 0)
+os.write(report, f"{time.perf_counter() - start} {usage.ru_maxrss}".encode())
+sys.exit(os.waitstatus_to_exitcode(status))
+"""
+
+
+class Scenario(NamedTuple):
+    name: str
+    script: str
+    arguments: list[str]
+    generate: Callable
+    generator_arguments: dict
+    large: bool = False
+
+
+SCENARIOS = [
+    Scenario(
+        "simenka-bitset-3k",
+        "1-NFA-with-eps-transitions/SimEnka.py",
+        [],
+        generators.write_enka,
+        {"seed": 1, "state_count": 3000, "sequence_count": 50},
+    ),
+    Scenario(
+        "simenka-lazy-3k",
+        "1-NFA-with-eps-transitions/SimEnka.py",
+        ["--engine", "lazy"],
+        generators.write_enka,
+        {"seed": 1, "state_count": 3000, "sequence_count": 50},
+    ),
+    Scenario(
+        "mindka-hopcroft-10k",
+        "2-DFA/MinDKA.py",
+        [],
+        generators.write_dfa,
+        {"seed": 2, "state_count": 10_000},
+    ),
+    Scenario(
+        "mindka-hopcroft-100k",
+        "2-DFA/MinDKA.py",
+        [],
+        generators.write_dfa,
+        {"seed": 3, "state_count": 100_000},
+    ),
+    Scenario(
+        "mindka-moore-100k",
+        "2-DFA/MinDKA.py",
+        ["--algorithm", "moore"],
+        generators.write_dfa,
+        {"seed": 3, "state_count": 100_000},
+    ),
+    Scenario(
+        "mindka-hopcroft-1m",
+        "2-DFA/MinDKA.py",
+        [],
+        generators.write_dfa,
+        {"seed": 4, "state_count": 1_000_000},
+        large=True,
+    ),
+    Scenario(
+        "simpa-trace-deep",
+        "3-Pushdown-automata/SimPa.py",
+        [],
+        generators.write_deep_pda,
+        {"seed": 2, "depth": 10_000},
+    ),
+    Scenario(
+        "simpa-accept-deep",
+        "3-Pushdown-automata/SimPa.py",
+        ["--accept-only"],
+        generators.write_deep_pda,
+        {"seed": 2, "depth": 200_000},
+    ),
+    Scenario(
+        "parser-table-nested",
+        "4-Recursive-descent-parser/Parser.py",
+        [],
+        generators.write_nested_parser_input,
+        {"seed": 6, "depth": 300_000},
+    ),
+    Scenario(
+        "parser-stream-nested",
+        "4-Recursive-descent-parser/Parser.py",
+        ["--stream"],
+        generators.write_nested_parser_input,
+        {"seed": 6, "depth": 300_000},
+    ),
+]
+
+
+def generate_input(scenario: Scenario, directory: str) -> str:
+    # Scenarios with the same generator and arguments share one input file
+    key = json.dumps(
+        [scenario.generate.__name__, scenario.generator_arguments], sort_keys=True
+    )
+    path = os.path.join(directory, hashlib.sha256(key.encode()).hexdigest()[:16])
+    if not os.path.exists(path):
+        with open(path, "w") as output:
+            scenario.generate(output, **scenario.generator_arguments)
+    return path
+
+
+def run_once(scenario: Scenario, input_path: str) -> tuple[float, int, str]:
+    # Returns the wall time, the peak RSS in KiB and the sha256 of the output
+    report_read, report_write = os.pipe()
+    with open(input_path, "rb") as stdin, tempfile.TemporaryFile() as stdout:
+        try:
+            process = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-S",
+                    "-c",
+                    MEASURE_COMMAND,
+                    str(report_write),
+                    sys.executable,
+                    os.path.join(REPOSITORY, scenario.script),
+                    *scenario.arguments,
+                ],
+                stdin=stdin,
+                stdout=stdout,
+                pass_fds=(report_write,),
+            )
+        finally:
+            os.close(report_write)
+        with os.fdopen(report_read) as report:
+            measurement = report.read().split()
+        if process.wait() != 0:
+            raise RuntimeError(
+                f"{scenario.name} exited with status {process.returncode}"
+            )
+        elapsed, max_rss = float(measurement[0]), int(measurement[1])
+
+        stdout.seek(0)
+        digest = hashlib.sha256()
+        while chunk := stdout.read(1 << 20):
+            digest.update(chunk)
+    return elapsed, max_rss, digest.hexdigest()
+
+
+def run_scenarios(
+    scenarios: list[Scenario], repeat: int, directory: str
+) -> dict[str, dict]:
+    results = {}
+    for scenario in scenarios:
+        input_path = generate_input(scenario, directory)
+        runs = [run_once(scenario, input_path) for _ in range(repeat)]
+        results[scenario.name] = {
+            "seconds": round(min(run[0] for run in runs), 4),
+            "max_rss_kib": max(run[1] for run in runs),
+            "input_bytes": os.path.getsize(input_path),
+            "output_sha256": runs[0][2],
+        }
+        print(
+            f"{scenario.name:<24} {results[scenario.name]['seconds']:>9.3f}s "
+            f"{results[scenario.name]['max_rss_kib'] / 1024:>9.1f} MiB",
+            file=sys.stderr,
+        )
+    return results
+
+
+def compare_with_baseline(
+    results: dict[str, dict], baseline: dict[str, dict], tolerance: float
+) -> list[str]:
+    # A scenario regresses if it is slower or larger than its baseline by more
+    # than `tolerance` (and by more than timer noise), or prints something else
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        if (
+            result["seconds"] > expected["seconds"] * (1 + tolerance)
+            and result["seconds"] - expected["seconds"] > 0.05
+        ):
+            regressions.append(
+                f"{name}: {result['seconds']:.3f}s, baseline {expected['seconds']:.3f}s"
+            )
+        if result["max_rss_kib"] > expected["max_rss_kib"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {result['max_rss_kib']} KiB, "
+                f"baseline {expected['max_rss_kib']} KiB"
+            )
+        if result["output_sha256"] != expected["output_sha256"]:
+            regressions.append(f"{name}: output differs from the baseline")
+    return regressions
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Run the benchmark scenarios and compare them with a baseline."
+    )
+    argument_parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=[scenario.name for scenario in SCENARIOS],
+        help="run only this scenario (can be given several times)",
+    )
+    argument_parser.add_argument(
+        "--large",
+        action="store_true",
+        help="also run the scenarios with million-state automata",
+    )
+    argument_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="runs per scenario; the fastest time and the largest memory are kept",
+    )
+    argument_parser.add_argument(
+        "--output",
+        help="write the results as JSON to this file, for example to record a "
+        "new baseline",
+    )
+    argument_parser.add_argument(
+        "--baseline",
+        default=DEFAULT_BASELINE,
+        help="JSON results to compare with; a missing file is skipped",
+    )
+    argument_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative slowdown or memory growth before a regression "
+        "is reported",
+    )
+    arguments = argument_parser.parse_args()
+    if arguments.repeat < 1:
+        argument_parser.error("--repeat must be at least 1")
+
+    if arguments.scenario:
+        selected = [
+            scenario for scenario in SCENARIOS if scenario.name in arguments.scenario
+        ]
+    else:
+        selected = [
+            scenario for scenario in SCENARIOS if arguments.large or not scenario.large
+        ]
+    with tempfile.TemporaryDirectory() as input_directory:
+        RESULTS = run_scenarios(selected, arguments.repeat, input_directory)
+
+    REPORT = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scenarios": RESULTS,
+    }
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(REPORT, output_file, indent=2, sort_keys=True)
+            output_file.write("\n")
+    else:
+        json.dump(REPORT, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if os.path.exists(arguments.baseline) and arguments.output != arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            BASELINE = json.load(baseline_file)["scenarios"]
+        REGRESSIONS = compare_with_baseline(RESULTS, BASELINE, arguments.tolerance)
+        for regression in REGRESSIONS:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if REGRESSIONS:
+            sys.exit(1)
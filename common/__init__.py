@@ -0,0 +1 @@
+"""Helpers shared by the laboratory exercise scripts."""
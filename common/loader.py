@@ -0,0 +1,252 @@
+"""Bulk loading of the transition lines of the automaton definitions.
+
+The tools used to run a regular expression on every transition line. Here the
+transition lines are joined into one block and, when only the expected
+separators occur between the fields of every line, the whole block is split at
+once with `str` methods. Any other block is split line by line by functions
+that pick the same fields as the original expressions. Either way the result
+is one column of fields per group of the expression, from which the tools
+build their tables. For SimEnka's compiled engines, `load_nfa_transitions`
+also interns the NFA lines into integer ids.
+"""
+
+import gc
+import sys
+from array import array
+from contextlib import contextmanager
+from functools import partial
+from itertools import accumulate, chain, compress
+from operator import methodcaller
+from typing import Iterable, Iterator, TextIO
+
+NFA_TRANSITION = "nfa"
+DFA_TRANSITION = "dfa"
+PDA_TRANSITION = "pda"
+# Compiled automata kept in memory by the tools' --serve mode
+DEFAULT_SERVED_AUTOMATA = 64
+
+# Deletes every ASCII character except the separators
+SEPARATOR_SKELETON = {code: None for code in range(128) if chr(code) not in ",->\n"}
+
+
+@contextmanager
+def paused_garbage_collection() -> Iterator[None]:
+    """Keep the cyclic garbage collector off for the `with` block.
+
+    Tables built from millions of lines consist of new containers without
+    cycles, and every collection triggered while they grow would traverse
+    them again for nothing.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def read_lines(input_stream: TextIO) -> list[str]:
+    """Read the rest of `input_stream` at once as a list of stripped lines.
+
+    The result equals `[line.strip() for line in input_stream.readlines()]`.
+    """
+    lines = input_stream.read().split("\n")
+    if not lines[-1]:
+        lines.pop()
+    return list(map(str.strip, lines))
+
+
+def split_nfa_transition(line: str) -> tuple[str, str, str] | None:
+    # Same groups as re.match(r"(.*),(.*)->(.*)", line): greedy groups put the
+    # arrow last and the comma last before it
+    head, arrow, next_states = line.rpartition("->")
+    state, comma, symbol = head.rpartition(",")
+    if not arrow or not comma:
+        return None
+    return state, symbol, next_states
+
+
+def split_dfa_transition(line: str) -> tuple[str, str, str] | None:
+    # Same groups as re.match(r"^(.+?),(.+?)->(.+)$", line): lazy non-empty
+    # groups take the first separator that leaves room for the next group
+    comma = line.find(",", 1)
+    if comma < 0:
+        return None
+    arrow = line.find("->", comma + 2)
+    if arrow < 0 or arrow + 2 >= len(line):
+        return None
+    return line[:comma], line[comma + 1 : arrow], line[arrow + 2 :]
+
+
+def split_pda_transition(line: str) -> tuple[str, str, str, str, str] | None:
+    # Same groups as re.match(r"^(.+?),(.+?),(.+?)->(.+?),(.+?)$", line)
+    first = line.find(",", 1)
+    if first < 0:
+        return None
+    second = line.find(",", first + 2)
+    if second < 0:
+        return None
+    arrow = line.find("->", second + 2)
+    if arrow < 0:
+        return None
+    third = line.find(",", arrow + 3)
+    if third < 0 or third + 1 >= len(line):
+        return None
+    return (
+        line[:first],
+        line[first + 1 : second],
+        line[second + 1 : arrow],
+        line[arrow + 2 : third],
+        line[third + 1 :],
+    )
+
+
+def split_nfa_block(block: str, line_count: int) -> list[list[str]] | None:
+    # Lines reading `state,symbol->targets`, where the targets may hold commas
+    # but no field holds `-` or `>`: the only comma before the arrow and the
+    # only arrow are the ones the greedy groups pick
+    if not block.isascii():
+        return None
+    skeleton = block.translate(SEPARATOR_SKELETON)
+    if (
+        skeleton.count("-") != line_count
+        or skeleton.count(">") != line_count
+        or f"\n{skeleton}".count("\n,->") != line_count
+    ):
+        return None
+    pieces = block.replace("\n", "->").split("->")
+    if len(pieces) != 2 * line_count:
+        return None
+    heads = ",".join(pieces[0::2]).split(",")
+    return [heads[0::2], heads[1::2], pieces[1::2]]
+
+
+def split_separated_block(
+    block: str, line_count: int, separators: str
+) -> list[list[str]] | None:
+    # Lines holding exactly `separators` between non-empty fields and no other
+    # `,`, `-` or `>`: then the lazy groups stop at the separators in order
+    if not block.isascii():
+        return None
+    if block.translate(SEPARATOR_SKELETON) != "\n".join([separators] * line_count):
+        return None
+    field_count = separators.replace("->", ",").count(",") + 1
+    fields = block.replace("->", ",").replace("\n", ",").split(",")
+    if len(fields) != field_count * line_count or "" in fields:
+        return None
+    return [fields[index::field_count] for index in range(field_count)]
+
+
+# Per line format: the number of fields, the splitter of one line and the
+# splitter of a whole block, which gives up on blocks it cannot handle
+LINE_FORMATS = {
+    NFA_TRANSITION: (3, split_nfa_transition, split_nfa_block),
+    DFA_TRANSITION: (
+        3,
+        split_dfa_transition,
+        partial(split_separated_block, separators=",->"),
+    ),
+    PDA_TRANSITION: (
+        5,
+        split_pda_transition,
+        partial(split_separated_block, separators=",,->,"),
+    ),
+}
+
+
+def split_transition_lines(
+    lines: list[str], line_format: str, warn: bool = True
+) -> list[list[str]]:
+    """Split stripped transition lines into one column per field.
+
+    Lines the format does not match are skipped, with a warning on standard
+    error if `warn` is set.
+    """
+    field_count, split_line, split_block = LINE_FORMATS[line_format]
+    if lines:
+        columns = split_block("\n".join(lines), len(lines))
+        if columns is not None:
+            return columns
+
+    fields = []
+    with paused_garbage_collection():
+        for line in lines:
+            line_fields = split_line(line)
+            if line_fields is None:
+                if warn:
+                    print(
+                        f"Warning: Malformed transition line skipped: {line.strip()}",
+                        file=sys.stderr,
+                    )
+                continue
+            fields.append(line_fields)
+        return list(map(list, zip(*fields))) or [[] for _ in range(field_count)]
+
+
+def intern_names(*columns: Iterable[str]) -> tuple[list[str], dict[str, int]]:
+    # Names numbered in order of first appearance, and the name -> id table
+    names = list(dict.fromkeys(chain(*columns)))
+    return names, dict(zip(names, range(len(names))))
+
+
+class TransitionTable:
+    """The transition lines of an NFA with state and symbol names interned as
+    integer ids.
+
+    `states` and `symbols` list the names by id, in order of first appearance,
+    and `state_ids` and `symbol_ids` map them back. Transition `index` leaves
+    state `sources[index]` on input symbol `inputs[index]` for the states
+    `targets[target_starts[index] : target_starts[index + 1]]`. Transitions
+    keep the order of their lines, repeated keys included.
+    """
+
+    def __init__(self) -> None:
+        self.states: list[str] = []
+        self.state_ids: dict[str, int] = {}
+        self.symbols: list[str] = []
+        self.symbol_ids: dict[str, int] = {}
+        self.sources = array("i")
+        self.inputs = array("i")
+        self.targets = array("i")
+        self.target_starts = array("i", [0])
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def target_ids(self, index: int) -> array:
+        return self.targets[self.target_starts[index] : self.target_starts[index + 1]]
+
+
+def drop_empty_nfa_transitions(columns: list[list[str]]) -> list[list[str]]:
+    """Leave out NFA lines whose targets are `#`, which means no transition."""
+    next_states = columns[2]
+    if "#" not in next_states:
+        return columns
+    selectors = list(map("#".__ne__, next_states))
+    return [list(compress(column, selectors)) for column in columns]
+
+
+def load_nfa_transitions(lines: list[str], warn: bool = True) -> TransitionTable:
+    """Split NFA transition lines like `split_transition_lines` and intern them
+    into a `TransitionTable`. Lines without a transition are left out.
+    """
+    sources, inputs, next_states = drop_empty_nfa_transitions(
+        split_transition_lines(lines, NFA_TRANSITION, warn)
+    )
+    flat_targets = ",".join(next_states).split(",") if next_states else []
+    table = TransitionTable()
+    table.states, table.state_ids = intern_names(sources, flat_targets)
+    table.symbols, table.symbol_ids = intern_names(inputs)
+    table.sources = array("i", map(table.state_ids.__getitem__, sources))
+    table.inputs = array("i", map(table.symbol_ids.__getitem__, inputs))
+    table.targets = array("i", map(table.state_ids.__getitem__, flat_targets))
+    # A line with k commas among its targets names k + 1 states
+    table.target_starts = array(
+        "i",
+        accumulate(
+            (count + 1 for count in map(methodcaller("count", ","), next_states)),
+            initial=0,
+        ),
+    )
+    return table
@@ -0,0 +1,168 @@
+"""Daemon mode of the tools: answer requests over a local Unix socket.
+
+A request is exactly what the tool would read from standard input, sent over
+one connection whose writing side is then shut down; the response is what the
+tool would write to standard output, after which the server closes the
+connection. A request that fails gets an empty response and the reason is
+printed on the server's standard error.
+
+The first `query_line_count` lines of a request are its query (the input
+strings of a simulator) and the rest define the automaton. The automaton
+compiled from a definition is kept in an LRU cache under the SHA-256 hash of
+the definition, so requests against a known automaton skip reading and
+compiling it.
+
+Work runs on worker threads while the event loop keeps accepting and reading
+connections. Compilations run one at a time, so compile functions may use
+the tools' module globals, and requests against one automaton are answered
+one at a time, since compiled automata may keep caches of their own; requests
+against different automata overlap.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import signal
+import socket
+import sys
+from collections import OrderedDict
+from contextlib import suppress
+from typing import Any, Callable
+
+from common.loader import DEFAULT_SERVED_AUTOMATA, read_lines
+
+RECEIVE_SIZE = 1 << 16
+
+
+class CachedAutomaton:
+    """A compiled automaton and the lock that serializes requests against it."""
+
+    def __init__(self, automaton: Any) -> None:
+        self.automaton = automaton
+        self.lock = asyncio.Lock()
+
+
+def split_request(
+    request: bytes, query_line_count: int
+) -> tuple[list[str], list[str], str]:
+    # Returns the query lines, the definition lines and the cache key. Lines are
+    # read like standard input, so line endings and surrounding whitespace do
+    # not change the key.
+    lines = read_lines(io.TextIOWrapper(io.BytesIO(request), encoding="utf-8"))
+    definition = lines[query_line_count:]
+    key = hashlib.sha256("\n".join(definition).encode()).hexdigest()
+    return lines[:query_line_count], definition, key
+
+
+class AutomatonServer:
+    """Answers requests with `answer(automaton, query_lines)`, which returns the
+    response bytes, on automata built by `compile_automaton(definition_lines)`.
+    """
+
+    def __init__(
+        self,
+        query_line_count: int,
+        compile_automaton: Callable[[list[str]], Any],
+        answer: Callable[[Any, list[str]], bytes],
+        max_automata: int = DEFAULT_SERVED_AUTOMATA,
+    ) -> None:
+        if max_automata < 1:
+            raise ValueError("max_automata must be at least 1")
+        self.query_line_count = query_line_count
+        self.compile_automaton = compile_automaton
+        self.answer = answer
+        self.max_automata = max_automata
+        self.automata: OrderedDict[str, CachedAutomaton] = OrderedDict()
+        self.compile_lock = asyncio.Lock()
+
+    async def get_automaton(self, definition: list[str], key: str) -> CachedAutomaton:
+        cached = self.automata.get(key)
+        if cached is not None:
+            self.automata.move_to_end(key)
+            return cached
+
+        async with self.compile_lock:
+            # Another request may have compiled it while this one waited
+            cached = self.automata.get(key)
+            if cached is None:
+                automaton = await asyncio.get_running_loop().run_in_executor(
+                    None, self.compile_automaton, definition
+                )
+                cached = CachedAutomaton(automaton)
+                self.automata[key] = cached
+                if len(self.automata) > self.max_automata:
+                    self.automata.popitem(last=False)
+        return cached
+
+    async def answer_request(self, request: bytes) -> bytes:
+        loop = asyncio.get_running_loop()
+        query, definition, key = await loop.run_in_executor(
+            None, split_request, request, self.query_line_count
+        )
+        cached = await self.get_automaton(definition, key)
+        async with cached.lock:
+            return await loop.run_in_executor(
+                None, self.answer, cached.automaton, query
+            )
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = await reader.read()
+            try:
+                response = await self.answer_request(request)
+            except (Exception, SystemExit) as error:
+                # The tools exit on malformed input; that ends only this request
+                print(f"Error: Request failed: {error!r}", file=sys.stderr)
+                response = b""
+            writer.write(response)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def serve_forever(self, socket_path: str) -> None:
+        """Accept connections on `socket_path` until SIGINT or SIGTERM."""
+        server = await asyncio.start_unix_server(self.handle_connection, socket_path)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, stop.set)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            with suppress(FileNotFoundError):
+                os.remove(socket_path)
+
+
+def serve(
+    socket_path: str,
+    query_line_count: int,
+    compile_automaton: Callable[[list[str]], Any],
+    answer: Callable[[Any, list[str]], bytes],
+    max_automata: int = DEFAULT_SERVED_AUTOMATA,
+) -> None:
+    """Run an `AutomatonServer` on `socket_path` until it is stopped."""
+    asyncio.run(
+        AutomatonServer(
+            query_line_count, compile_automaton, answer, max_automata
+        ).serve_forever(socket_path)
+    )
+
+
+def send_request(socket_path: str, request: bytes) -> bytes:
+    """Send one request to a server on `socket_path` and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(request)
+        connection.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := connection.recv(RECEIVE_SIZE):
+            chunks.append(chunk)
+    return b"".join(chunks)
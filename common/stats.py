@@ -0,0 +1,95 @@
+"""Opt-in instrumentation of the tools, reported as JSON on standard error.
+
+Every tool keeps a module-level `STATS` that stays `None` unless `--stats` is
+given. Hot paths check it at most once per call (or replace functions with
+counting wrappers only when it is set), so a run without `--stats` does
+practically no extra work.
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, ContextManager, Iterator, TextIO
+
+
+class Stats:
+    """Counters, maxima and per-phase wall times of one run."""
+
+    def __init__(self, tool: str) -> None:
+        self.tool = tool
+        self.counters: dict[str, int] = {}
+        self.maxima: dict[str, int] = {}
+        self.phases: dict[str, float] = {}
+        self.depths: dict[str, int] = {}
+        self.active_phases: list[str] = []
+        self.phase_start = 0.0
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_max(self, name: str, value: int) -> None:
+        if value > self.maxima.get(name, 0):
+            self.maxima[name] = value
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the wall time of the `with` block to phase `name`.
+
+        Phases nested in it pause it, so every moment counts towards one phase.
+        """
+        self.switch_phase()
+        self.active_phases.append(name)
+        try:
+            yield
+        finally:
+            self.switch_phase()
+            self.active_phases.pop()
+
+    def switch_phase(self) -> None:
+        # Charge the time since the last switch to the innermost active phase
+        now = time.perf_counter()
+        if self.active_phases:
+            name = self.active_phases[-1]
+            self.phases[name] = self.phases.get(name, 0.0) + now - self.phase_start
+        self.phase_start = now
+
+    def track_calls(self, function: Callable, calls: str, depth: str) -> Callable:
+        """Wrap `function` to count its calls in `calls` and record in `depth`
+        how deeply calls of all functions wrapped with that name nest.
+        """
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            current_depth = self.depths.get(depth, 0) + 1
+            self.depths[depth] = current_depth
+            self.count(calls)
+            self.record_max(depth, current_depth)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.depths[depth] = current_depth - 1
+
+        return wrapper
+
+    def report(self, stream: TextIO | None = None) -> None:
+        """Write everything collected as one line of JSON to `stream`."""
+        json.dump(
+            {
+                "tool": self.tool,
+                "counters": self.counters,
+                "maxima": self.maxima,
+                "phase_seconds": {
+                    name: round(seconds, 6) for name, seconds in self.phases.items()
+                },
+            },
+            stream or sys.stderr,
+            sort_keys=True,
+        )
+        (stream or sys.stderr).write("\n")
+
+
+def timed_phase(stats: Stats | None, name: str) -> ContextManager:
+    """Time phase `name` in `stats`, or do nothing if instrumentation is off."""
+    return nullcontext() if stats is None else stats.phase(name)
@@ -0,0 +1,119 @@
+"""Incremental reading of the `|`/`,` separated input line used by the simulators.
+
+The input sequences come first in the input but can only be simulated once the
+automaton that follows them has been read. `detach_first_line` skips over the
+first line without keeping it in memory and `iter_input_symbols` later walks it
+chunk by chunk, so peak memory does not depend on the length of that line.
+"""
+
+import io
+import sys
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+from typing import BinaryIO, Callable, Iterator, TextIO
+
+CHUNK_SIZE = 1 << 16
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+
+def detach_first_line(
+    input_stream: TextIO, chunk_size: int = CHUNK_SIZE
+) -> Callable[[], TextIO]:
+    """Move `input_stream` past its first line and return a function that
+    gives a stream positioned at the start of that line.
+
+    Seekable inputs are rewound in place; pipes are spooled to a temporary file.
+    """
+    if input_stream.seekable():
+        first_line_start = input_stream.tell()
+        while True:
+            piece = input_stream.readline(chunk_size)
+            if not piece or piece.endswith("\n"):
+                break
+
+        def rewind() -> TextIO:
+            input_stream.seek(first_line_start)
+            return input_stream
+
+        return rewind
+
+    spool = tempfile.TemporaryFile("w+")
+    while True:
+        piece = input_stream.readline(chunk_size)
+        spool.write(piece)
+        if not piece or piece.endswith("\n"):
+            break
+
+    def rewind_spool() -> TextIO:
+        spool.seek(0)
+        return spool
+
+    return rewind_spool
+
+
+def iter_input_symbols(
+    input_stream: TextIO, chunk_size: int = CHUNK_SIZE
+) -> Iterator[tuple[int, str]]:
+    """Yield `(sequence_index, symbol)` pairs for one stripped input line.
+
+    The result matches `[part.split(",") for part in line.strip().split("|")]`
+    flattened, including empty symbols, but only one chunk is held at a time.
+    """
+    sequence_index = 0
+    pending_symbol = ""
+    strip_leading = True
+
+    while True:
+        chunk = input_stream.readline(chunk_size)
+        at_line_end = not chunk or chunk.endswith("\n")
+        if strip_leading:
+            chunk = chunk.lstrip()
+            strip_leading = not chunk and not at_line_end
+
+        parts = chunk.split("|")
+        for part_index, part in enumerate(parts):
+            if part_index > 0:
+                yield sequence_index, pending_symbol
+                sequence_index += 1
+                pending_symbol = ""
+            symbols = part.split(",")
+            symbols[0] = pending_symbol + symbols[0]
+            for symbol in symbols[:-1]:
+                yield sequence_index, symbol
+            pending_symbol = symbols[-1]
+
+        if at_line_end:
+            yield sequence_index, pending_symbol.rstrip()
+            return
+
+
+def iter_input_sequences(
+    input_stream: TextIO, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Iterator[str]]:
+    """Yield one lazy symbol iterator per input sequence.
+
+    Symbols a consumer leaves unread are skipped before the next sequence.
+    """
+    for _, sequence in groupby(
+        iter_input_symbols(input_stream, chunk_size), key=itemgetter(0)
+    ):
+        yield map(itemgetter(1), sequence)
+
+
+def open_output() -> TextIO:
+    """Return one large-buffered writer over standard output."""
+    return io.open(
+        sys.stdout.fileno(),
+        "w",
+        buffering=OUTPUT_BUFFER_SIZE,
+        encoding=sys.stdout.encoding,
+        closefd=False,
+    )
+
+
+def open_binary_output() -> BinaryIO:
+    """Return one large-buffered binary writer over standard output."""
+    return io.open(
+        sys.stdout.fileno(), "wb", buffering=OUTPUT_BUFFER_SIZE, closefd=False
+    )